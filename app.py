@@ -4,13 +4,19 @@ Advanced Twitter Sentiment Analysis Dashboard
 """
 
 from flask import Flask, render_template, request, jsonify
+import math
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # Import custom modules
-from twitter_api import TwitterAPI, TwitterStreamer
+from twitter_api import PartialList, TwitterAPI, TwitterStreamer, prefetch
+from caching import LRUCache, SQLiteCache, SingleFlight
 from sentiment_analyzer import SentimentAnalyzer
 from data_visualizer import DataVisualizer
+from pipeline import SentimentAggregator, TweetHistory, aggregate, compare_stats, iter_analyzed
+from rate_limit import RateLimitExceeded
 
 # Load environment variables
 load_dotenv()
@@ -21,20 +27,110 @@ app = Flask(__name__)
 BEARER_TOKEN = os.getenv('BEARER_TOKEN')
 MODEL_PATH = os.getenv('MODEL_PATH', 'trained_model.sav')
 VECTORIZER_PATH = os.getenv('VECTORIZER_PATH', 'vectorizer.pkl')
+SENTIMENT_ENGINE = os.getenv('SENTIMENT_ENGINE', 'numpy')
+MODEL_BUNDLE_PATH = os.getenv('MODEL_BUNDLE_PATH', 'model_bundle.npz')
+MODEL_MMAP = os.getenv('MODEL_MMAP', '1') == '1'
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 10000))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', 0)) or None
+NEUTRAL_THRESHOLD = float(os.getenv('NEUTRAL_THRESHOLD')) if os.getenv('NEUTRAL_THRESHOLD') else None
+MAX_FETCH_RESULTS = int(os.getenv('MAX_FETCH_RESULTS', 5000))
+FETCH_TIME_BUDGET = float(os.getenv('FETCH_TIME_BUDGET', 20))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 600))
+TWEET_CACHE_TTL = float(os.getenv('TWEET_CACHE_TTL', 60))
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 1000))
+# Set to a file path to share cached Twitter responses between workers
+RESPONSE_CACHE_PATH = os.getenv('RESPONSE_CACHE_PATH')
+TWEET_HISTORY_TTL = float(os.getenv('TWEET_HISTORY_TTL', 900))
+TWEET_HISTORY_SIZE = int(os.getenv('TWEET_HISTORY_SIZE', 100))
+# Larger analyses are streamed without keeping their tweets for reuse
+TWEET_HISTORY_MAX_TWEETS = int(os.getenv('TWEET_HISTORY_MAX_TWEETS', 500))
+# Set to a file path to share the analyzed-tweet history between workers
+TWEET_HISTORY_PATH = os.getenv('TWEET_HISTORY_PATH')
+# Tweets returned per sentiment category; the dashboard renders the first 5
+CATEGORY_SIZE = int(os.getenv('CATEGORY_SIZE', 5))
+
+
+
+class ModelLoader:
+    """
+    Builds the SentimentAnalyzer in a background thread so importing the app,
+    worker boot and /health never block on the model load
+    """
+    def __init__(self, factory):
+        self._factory = factory
+        self._analyzer = None
+        self._start()
+        # A preloading gunicorn master forks workers without the loader thread
+        os.register_at_fork(after_in_child=self._restart_in_child)
+    
+    def _start(self):
+        self._ready = threading.Event()
+        threading.Thread(target=self._load, name='sentiment-model-loader', daemon=True).start()
+    
+    def _restart_in_child(self):
+        if not self._ready.is_set():
+            self._start()
+    
+    def _load(self):
+        try:
+            self._analyzer = self._factory()
+        except Exception as e:
+            print(f"✗ Error loading sentiment model: {e}")
+        finally:
+            self._ready.set()
+    
+    def status(self):
+        """'loading', 'ready' or 'failed'"""
+        if not self._ready.is_set():
+            return 'loading'
+        if self._analyzer is not None and self._analyzer.is_loaded():
+            return 'ready'
+        return 'failed'
+    
+    def get(self):
+        """Return the analyzer, waiting only if the load is still in progress"""
+        self._ready.wait()
+        return self._analyzer
+
 
 # Initialize modules
-twitter_api = TwitterAPI(BEARER_TOKEN) if BEARER_TOKEN else None
-sentiment_analyzer = SentimentAnalyzer(MODEL_PATH, VECTORIZER_PATH)
+response_cache = SQLiteCache(RESPONSE_CACHE_PATH) if RESPONSE_CACHE_PATH else LRUCache(RESPONSE_CACHE_SIZE)
+twitter_api = TwitterAPI(BEARER_TOKEN, cache=response_cache, cache_ttls={
+    'user': USER_CACHE_TTL,
+    'user_tweets': TWEET_CACHE_TTL,
+    'replies': TWEET_CACHE_TTL,
+    'search': TWEET_CACHE_TTL,
+    'tweet': TWEET_CACHE_TTL
+}) if BEARER_TOKEN else None
+tweet_history = TweetHistory(
+    SQLiteCache(TWEET_HISTORY_PATH) if TWEET_HISTORY_PATH else LRUCache(TWEET_HISTORY_SIZE),
+    TWEET_HISTORY_TTL, TWEET_HISTORY_MAX_TWEETS
+)
+model_loader = ModelLoader(lambda: SentimentAnalyzer(
+    MODEL_PATH, VECTORIZER_PATH, engine=SENTIMENT_ENGINE,
+    bundle_path=MODEL_BUNDLE_PATH, mmap=MODEL_MMAP,
+    cache_size=PREDICTION_CACHE_SIZE, cache_ttl=PREDICTION_CACHE_TTL,
+    neutral_threshold=NEUTRAL_THRESHOLD
+))
 visualizer = DataVisualizer()
+search_analyses = SingleFlight()
 
 print("\n" + "="*60)
 print("ADVANCED TWITTER SENTIMENT ANALYSIS SYSTEM")
 print("="*60)
 print(f"✓ Twitter API: {'Connected' if twitter_api else 'Not Connected'}")
-print(f"✓ Sentiment Model: {'Loaded' if sentiment_analyzer.model else 'Not Loaded'}")
+print("✓ Sentiment Model: Loading in background")
 print("="*60 + "\n")
 
 
+def rate_limited(error):
+    """429 with Retry-After for a request refused by the Twitter rate-limit scheduler"""
+    retry_after = math.ceil(error.retry_after)
+    response = jsonify({'error': str(error), 'retry_after': retry_after})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+
 @app.route('/')
 def index():
     """Main dashboard"""
@@ -61,6 +157,8 @@ def get_user_info():
             'user_info': user_info
         })
         
+    except RateLimitExceeded as e:
+        return rate_limited(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -71,32 +169,45 @@ def get_user_tweets():
     try:
         data = request.get_json()
         username = data.get('username', '')
-        max_results = int(data.get('max_results', 50))
+        user_id = data.get('user_id')
+        max_results = min(int(data.get('max_results', 50)), MAX_FETCH_RESULTS)
         
-        if not username or not twitter_api:
+        # user_id, when given, is the numeric id of an already-resolved user
+        if not username or not twitter_api or (user_id and not str(user_id).isdigit()):
             return jsonify({'error': 'Invalid request'}), 400
         
-        # Get tweets
-        tweets = twitter_api.get_user_tweets(username, max_results)
+        user_id = int(user_id) if user_id else twitter_api.resolve_user_id(username)
+        if user_id is None:
+            return jsonify({'error': f'User @{username} not found'}), 404
+        
+        # Get only tweets newer than the ones already analyzed; the history
+        # belongs to the id the tweets are fetched with, not the username
+        history = tweet_history.lookup('user', user_id, max_results)
+        tweets = twitter_api.get_user_tweets(
+            username, max_results, deadline=time.monotonic() + FETCH_TIME_BUDGET,
+            user_id=user_id,
+            since_id=history['newest_id'] if history else None,
+            fields=()
+        )
         
         if tweets is None:
             return jsonify({'error': 'Failed to fetch tweets'}), 500
         
-        if not tweets:
-            return jsonify({'error': 'No tweets found'}), 404
+        # Analyze sentiment of the new tweets and merge them with the stored ones
+        sentiment_analyzer = model_loader.get()
+        analyzed_tweets = tweet_history.merge(
+            'user', user_id, max_results, sentiment_analyzer.analyze_tweets(tweets), history,
+            complete=not isinstance(tweets, PartialList)
+        )
         
-        # Analyze sentiment
-        analyzed_tweets = sentiment_analyzer.analyze_tweets(tweets)
-        stats = sentiment_analyzer.get_sentiment_stats(analyzed_tweets)
-        categorized = sentiment_analyzer.categorize_tweets(analyzed_tweets)
+        if not analyzed_tweets:
+            return jsonify({'error': 'No tweets found'}), 404
         
-        # Prepare charts
-        charts = {
-            'pie_chart': visualizer.prepare_sentiment_pie_chart(stats),
-            'bar_chart': visualizer.prepare_sentiment_bar_chart(stats),
-            'timeline': visualizer.prepare_timeline_chart(analyzed_tweets),
-            'engagement': visualizer.prepare_engagement_chart(analyzed_tweets)
-        }
+        # Stats, categories and charts in one pass over the tweets
+        aggregator = aggregate(analyzed_tweets, category_size=CATEGORY_SIZE)
+        stats = aggregator.stats()
+        categorized = aggregator.categorized()
+        charts = aggregator.charts(('pie_chart', 'bar_chart', 'timeline', 'engagement'))
         
         return jsonify({
             'success': True,
@@ -106,6 +217,8 @@ def get_user_tweets():
             'charts': charts
         })
         
+    except RateLimitExceeded as e:
+        return rate_limited(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -120,15 +233,16 @@ def get_tweet_replies():
         if not tweet_id or not twitter_api:
             return jsonify({'error': 'Invalid request'}), 400
         
-        # Get tweet details
-        tweet = twitter_api.get_single_tweet(tweet_id)
+        # Get tweet details and replies concurrently
+        tweet, replies = twitter_api.gather(
+            (twitter_api.get_single_tweet, tweet_id, ()),
+            (twitter_api.get_tweet_replies, tweet_id, 100, None, ())
+        )
         if not tweet:
             return jsonify({'error': 'Tweet not found'}), 404
         
-        # Get replies
-        replies = twitter_api.get_tweet_replies(tweet_id)
-        
         # Analyze replies
+        sentiment_analyzer = model_loader.get()
         reply_analysis = sentiment_analyzer.analyze_replies(replies)
         
         # Prepare charts if replies exist
@@ -147,6 +261,8 @@ def get_tweet_replies():
             'charts': charts
         })
         
+    except RateLimitExceeded as e:
+        return rate_limited(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -164,19 +280,20 @@ def compare_users():
             return jsonify({'error': 'Invalid request'}), 400
         
         # Get comparison data
-        comparison = twitter_api.compare_users(username1, username2, max_tweets)
+        comparison = twitter_api.compare_users(username1, username2, max_tweets, fields=())
         
         if not comparison:
             return jsonify({'error': 'Failed to compare users'}), 500
         
         # Analyze sentiment for both users
+        sentiment_analyzer = model_loader.get()
         user1_analyzed = sentiment_analyzer.analyze_tweets(comparison['user1']['tweets'])
         user2_analyzed = sentiment_analyzer.analyze_tweets(comparison['user2']['tweets'])
+        user1_stats = aggregate(user1_analyzed, sample_size=0, category_size=0, top_n=0).stats()
+        user2_stats = aggregate(user2_analyzed, sample_size=0, category_size=0, top_n=0).stats()
         
         # Get sentiment comparison
-        sentiment_comparison = sentiment_analyzer.compare_sentiment(
-            user1_analyzed, user2_analyzed
-        )
+        sentiment_comparison = compare_stats(user1_stats, user2_stats)
         
         # Prepare charts
         charts = {
@@ -193,17 +310,19 @@ def compare_users():
             'user1': {
                 'info': comparison['user1']['info'],
                 'tweets': user1_analyzed,
-                'stats': sentiment_analyzer.get_sentiment_stats(user1_analyzed)
+                'stats': user1_stats
             },
             'user2': {
                 'info': comparison['user2']['info'],
                 'tweets': user2_analyzed,
-                'stats': sentiment_analyzer.get_sentiment_stats(user2_analyzed)
+                'stats': user2_stats
             },
             'comparison': sentiment_comparison,
             'charts': charts
         })
         
+    except RateLimitExceeded as e:
+        return rate_limited(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -219,26 +338,27 @@ def compare_tweets():
         if not tweet_id1 or not tweet_id2 or not twitter_api:
             return jsonify({'error': 'Invalid request'}), 400
         
-        # Get both tweets
-        tweet1 = twitter_api.get_single_tweet(tweet_id1)
-        tweet2 = twitter_api.get_single_tweet(tweet_id2)
+        # Get both tweets and their replies, all fetched concurrently
+        fetched = twitter_api.compare_tweets(tweet_id1, tweet_id2, fields=())
         
-        if not tweet1 or not tweet2:
+        if not fetched:
             return jsonify({'error': 'One or both tweets not found'}), 404
         
-        # Get replies for both
-        replies1 = twitter_api.get_tweet_replies(tweet_id1)
-        replies2 = twitter_api.get_tweet_replies(tweet_id2)
+        tweet1 = fetched['tweet1']['details']
+        tweet2 = fetched['tweet2']['details']
+        replies1 = fetched['tweet1']['replies']
+        replies2 = fetched['tweet2']['replies']
         
         # Analyze both
+        sentiment_analyzer = model_loader.get()
         analyzed1 = sentiment_analyzer.analyze_tweets(replies1)
         analyzed2 = sentiment_analyzer.analyze_tweets(replies2)
         
-        stats1 = sentiment_analyzer.get_sentiment_stats(analyzed1)
-        stats2 = sentiment_analyzer.get_sentiment_stats(analyzed2)
+        stats1 = aggregate(analyzed1, sample_size=0, category_size=0, top_n=0).stats()
+        stats2 = aggregate(analyzed2, sample_size=0, category_size=0, top_n=0).stats()
         
         # Compare
-        comparison = sentiment_analyzer.compare_sentiment(analyzed1, analyzed2)
+        comparison = compare_stats(stats1, stats2)
         
         # Prepare charts
         charts = {
@@ -263,52 +383,73 @@ def compare_tweets():
             'charts': charts
         })
         
+    except RateLimitExceeded as e:
+        return rate_limited(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def run_search_analysis(query, max_results):
+    """
+    Search tweets newer than the stored history page by page, analyzing each
+    page while the next one downloads and folding it into the aggregates,
+    then add the already-analyzed ones
+    Searches larger than the history covers keep nothing beyond the aggregates
+    Returns: the aggregator's stats/categorized/tweets/charts
+    """
+    history_key = query.strip()
+    history = tweet_history.lookup('search', history_key, max_results)
+    progress = {'complete': True}
+    pages = prefetch(twitter_api.iter_search_tweets(
+        query, max_results, deadline=time.monotonic() + FETCH_TIME_BUDGET,
+        since_id=history['newest_id'] if history else None,
+        fields=('hashtags',),
+        progress=progress
+    ))
+    
+    aggregator = SentimentAggregator(category_size=CATEGORY_SIZE)
+    keep = tweet_history.covers(max_results)
+    new_tweets = []
+    for batch in iter_analyzed(pages, model_loader.get()):
+        aggregator.update(batch)
+        if keep:
+            new_tweets.extend(batch)
+    
+    if keep:
+        # merge() returns the new tweets first; only the reused ones are left to add
+        merged = tweet_history.merge('search', history_key, max_results, new_tweets, history, progress['complete'])
+        aggregator.update(merged[len(new_tweets):])
+    return aggregator.result()
+
+
 @app.route('/api/search-analyze', methods=['POST'])
 def search_and_analyze():
     """Search tweets and analyze sentiment with charts"""
     try:
         data = request.get_json()
         query = data.get('query', '')
-        max_results = int(data.get('max_results', 100))
+        max_results = min(int(data.get('max_results', 100)), MAX_FETCH_RESULTS)
         
         if not query or not twitter_api:
             return jsonify({'error': 'Invalid request'}), 400
         
-        # Search tweets
-        tweets = twitter_api.search_tweets(query, max_results)
+        # Identical searches already in flight wait for that one fetch + analysis
+        result = search_analyses.do((query.strip(), max_results), run_search_analysis, query, max_results)
         
-        if not tweets:
+        if not result['stats']:
             return jsonify({'error': 'No tweets found'}), 404
         
-        # Analyze
-        analyzed = sentiment_analyzer.analyze_tweets(tweets)
-        stats = sentiment_analyzer.get_sentiment_stats(analyzed)
-        categorized = sentiment_analyzer.categorize_tweets(analyzed)
-        
-        # Prepare all charts
-        charts = {
-            'pie_chart': visualizer.prepare_sentiment_pie_chart(stats),
-            'bar_chart': visualizer.prepare_sentiment_bar_chart(stats),
-            'timeline': visualizer.prepare_timeline_chart(analyzed),
-            'engagement': visualizer.prepare_engagement_chart(analyzed),
-            'hashtags': visualizer.prepare_hashtag_chart(analyzed),
-            'hourly': visualizer.prepare_sentiment_by_hour(analyzed),
-            'confidence': visualizer.prepare_confidence_distribution(analyzed)
-        }
-        
         return jsonify({
             'success': True,
             'query': query,
-            'stats': stats,
-            'categorized': categorized,
-            'tweets': analyzed[:50],
-            'charts': charts
+            'stats': result['stats'],
+            'categorized': result['categorized'],
+            'tweets': result['tweets'],
+            'charts': result['charts']
         })
         
+    except RateLimitExceeded as e:
+        return rate_limited(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -323,12 +464,14 @@ def test_sentiment():
         if not text:
             return jsonify({'error': 'Text required'}), 400
         
-        sentiment, confidence = sentiment_analyzer.predict_sentiment(text)
+        sentiment_analyzer = model_loader.get()
+        cleaned_text = sentiment_analyzer.clean_text(text)
+        sentiment, confidence = sentiment_analyzer.predict_cleaned([cleaned_text])[0]
         
         return jsonify({
             'success': True,
             'text': text,
-            'cleaned_text': sentiment_analyzer.clean_text(text),
+            'cleaned_text': cleaned_text,
             'sentiment': sentiment,
             'confidence': round(confidence * 100, 2)
         })
@@ -340,10 +483,19 @@ def test_sentiment():
 @app.route('/health')
 def health():
     """System health check"""
+    model_status = model_loader.status()
+    
     return jsonify({
         'status': 'running',
         'twitter_api': twitter_api is not None,
-        'sentiment_model': sentiment_analyzer.model is not None,
+        'sentiment_model': model_status == 'ready',
+        'sentiment_model_status': model_status,
+        'model_memory': model_loader.get().memory_usage() if model_status == 'ready' else None,
+        'prediction_cache': model_loader.get().cache_stats() if model_status == 'ready' else None,
+        'response_cache': twitter_api.cache.stats() if twitter_api else None,
+        'rate_limits': twitter_api.rate_limiter.stats() if twitter_api else None,
+        'search_coalescing': search_analyses.stats(),
+        'tweet_history': tweet_history.stats(),
         'bearer_token': BEARER_TOKEN is not None
     })
 
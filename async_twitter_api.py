@@ -0,0 +1,324 @@
+"""
+Async Twitter API Module - asyncio-native Twitter v2 client
+
+Same methods and return shapes as TwitterAPI, but every call is a coroutine
+on one pooled httpx.AsyncClient, so many lookups can share a single event
+loop instead of each holding a worker thread:
+
+    async with AsyncTwitterAPI(bearer_token) as api:
+        user1, user2 = await asyncio.gather(
+            api.get_user_info('alice'), api.get_user_info('bob')
+        )
+
+A 429 raises RateLimitExceeded, as TwitterAPI does, so callers can answer
+with a Retry-After. base_url can point at a local fake v2 server for testing.
+"""
+
+import asyncio
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+import httpx
+
+from caching import LRUCache
+from rate_limit import DEFAULT_RETRY_AFTER, RateLimitExceeded, RateLimitScheduler
+
+TWITTER_API_URL = 'https://api.twitter.com/2'
+
+# Twitter handles: 1-15 letters, digits or underscores
+USERNAME_PATTERN = re.compile(r'^[A-Za-z0-9_]{1,15}$')
+
+
+def _parse_time(value):
+    """Twitter v2 timestamps ('2024-01-01T12:00:00.000Z') as aware datetimes"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _format_time(value):
+    """datetime -> the RFC 3339 form the v2 API expects"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _path_segment(value):
+    """An id as a single, escaped path segment"""
+    return quote(str(value), safe='')
+
+
+def _retry_after(response):
+    """Seconds until a 429 response's window resets, from its rate-limit headers"""
+    try:
+        return max(int(response.headers['x-rate-limit-reset']) - time.time(), 0)
+    except (KeyError, ValueError):
+        pass
+    try:
+        return max(float(response.headers['retry-after']), 0)
+    except (KeyError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+class AsyncTwitterAPI:
+    def __init__(self, bearer_token, base_url=TWITTER_API_URL, max_connections=20, timeout=10.0,
+                 user_cache_size=1000, user_cache_ttl=600):
+        """
+        Initialize the async client
+        max_connections: size of the shared keep-alive connection pool
+        user_cache_size / user_cache_ttl: username -> user info cache
+        """
+        self.user_cache = LRUCache(user_cache_size, user_cache_ttl)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={'Authorization': f'Bearer {bearer_token}'},
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            timeout=timeout
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _get(self, path, **params):
+        """
+        GET a v2 endpoint; list parameters are sent comma-separated
+        Raises: RateLimitExceeded on a 429, httpx.HTTPStatusError on other errors
+        """
+        params = {
+            key: ','.join(value) if isinstance(value, (list, tuple)) else value
+            for key, value in params.items() if value is not None
+        }
+        response = await self.client.get(path, params=params)
+        if response.status_code == 429:
+            raise RateLimitExceeded(RateLimitScheduler.endpoint_for(str(response.url)), _retry_after(response))
+        response.raise_for_status()
+        return response.json()
+
+    async def _paginate(self, path, max_results, token_param='pagination_token',
+                        min_page_size=10, **params):
+        """
+        Follow next_token across pages
+        Returns: list of raw tweet objects, at most max_results
+        """
+        results = []
+        token = None
+
+        while len(results) < max_results:
+            page_size = max(min(max_results - len(results), 100), min_page_size)
+            if token:
+                params[token_param] = token
+
+            body = await self._get(path, max_results=page_size, **params)
+            results.extend(body.get('data', []))
+            token = body.get('meta', {}).get('next_token')
+            if not token:
+                break
+
+        return results[:max_results]
+
+    @staticmethod
+    def _format_tweet(tweet):
+        """Common fields of a tweet dict, as TwitterAPI returns them"""
+        metrics = tweet.get('public_metrics', {})
+        return {
+            'id': int(tweet['id']),
+            'text': tweet['text'],
+            'created_at': _parse_time(tweet.get('created_at')),
+            'likes': metrics.get('like_count', 0),
+            'retweets': metrics.get('retweet_count', 0),
+            'replies': metrics.get('reply_count', 0)
+        }
+
+    async def get_user_info(self, username):
+        """
+        Get detailed user information
+        Returns: user data with followers, following, tweet count
+        """
+        try:
+            username = username.replace('@', '')
+            if not USERNAME_PATTERN.match(username):
+                return None
+            cache_key = username.lower()
+            cached = self.user_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            body = await self._get(
+                f'/users/by/username/{username}',
+                **{'user.fields': ['created_at', 'description', 'public_metrics', 'verified']}
+            )
+
+            data = body.get('data')
+            if not data:
+                return None
+
+            metrics = data['public_metrics']
+            user_info = {
+                'id': int(data['id']),
+                'username': data['username'],
+                'name': data['name'],
+                'description': data.get('description'),
+                'created_at': _parse_time(data.get('created_at')),
+                'verified': data.get('verified'),
+                'followers_count': metrics['followers_count'],
+                'following_count': metrics['following_count'],
+                'tweet_count': metrics['tweet_count'],
+                'listed_count': metrics['listed_count']
+            }
+            self.user_cache.set(cache_key, user_info)
+            return user_info
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"Error getting user info: {e}")
+            return None
+
+    async def get_user_tweets(self, username, max_results=100, user_id=None):
+        """
+        Get user's recent tweets
+        user_id: already-resolved numeric id; skips the user lookup
+        Returns: list of tweets with metadata
+        """
+        try:
+            if user_id is None:
+                user_info = await self.get_user_info(username)
+                if not user_info:
+                    return None
+                user_id = user_info['id']
+
+            return await self._user_tweets_by_id(user_id, max_results)
+
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"Error getting user tweets: {e}")
+            return None
+
+    async def _user_tweets_by_id(self, user_id, max_results):
+        """Timeline of an already-resolved user id (raises on API errors)"""
+        tweets = await self._paginate(
+            f"/users/{_path_segment(user_id)}/tweets", max_results,
+            min_page_size=5,
+            exclude=['retweets'],
+            **{'tweet.fields': ['created_at', 'public_metrics', 'referenced_tweets']}
+        )
+
+        return [
+            {
+                **self._format_tweet(tweet),
+                'impressions': tweet.get('public_metrics', {}).get('impression_count', 0)
+            }
+            for tweet in tweets
+        ]
+
+    async def get_tweet_replies(self, tweet_id, max_results=100):
+        """
+        Get replies/comments on a specific tweet
+        Returns: list of reply tweets
+        """
+        try:
+            tweets = await self._paginate(
+                '/tweets/search/recent', max_results,
+                token_param='next_token',
+                query=f"conversation_id:{tweet_id}",
+                **{'tweet.fields': ['created_at', 'public_metrics', 'author_id', 'referenced_tweets']}
+            )
+
+            return [
+                {**self._format_tweet(tweet), 'author_id': int(tweet['author_id'])}
+                for tweet in tweets
+                if any(ref.get('type') == 'replied_to' for ref in tweet.get('referenced_tweets') or [])
+            ]
+
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"Error getting tweet replies: {e}")
+            return []
+
+    async def search_tweets(self, query, max_results=100, start_time=None):
+        """
+        Search tweets by query
+        """
+        try:
+            if start_time is None:
+                start_time = datetime.utcnow() - timedelta(days=7)
+
+            tweets = await self._paginate(
+                '/tweets/search/recent', max_results,
+                token_param='next_token',
+                query=query,
+                start_time=_format_time(start_time),
+                **{'tweet.fields': ['created_at', 'public_metrics', 'author_id', 'entities']}
+            )
+
+            return [
+                {
+                    **self._format_tweet(tweet),
+                    'author_id': int(tweet['author_id']),
+                    'hashtags': [tag['tag'] for tag in (tweet.get('entities') or {}).get('hashtags', [])]
+                }
+                for tweet in tweets
+            ]
+
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"Error searching tweets: {e}")
+            return []
+
+    async def get_single_tweet(self, tweet_id):
+        """
+        Get details of a single tweet
+        """
+        try:
+            body = await self._get(
+                f'/tweets/{_path_segment(tweet_id)}',
+                **{'tweet.fields': ['created_at', 'public_metrics', 'author_id']}
+            )
+
+            data = body.get('data')
+            if not data:
+                return None
+
+            return {**self._format_tweet(data), 'author_id': int(data['author_id'])}
+
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"Error getting single tweet: {e}")
+            return None
+
+    async def _user_with_tweets(self, username, max_tweets):
+        """Resolve a user once, then fetch their timeline by id"""
+        user_info = await self.get_user_info(username)
+        if not user_info:
+            return None, None
+
+        return user_info, await self.get_user_tweets(username, max_tweets, user_id=user_info['id'])
+
+    async def compare_users(self, username1, username2, max_tweets=50):
+        """
+        Compare two users' profiles and tweets, both users fetched concurrently
+        """
+        (user1_info, user1_tweets), (user2_info, user2_tweets) = await asyncio.gather(
+            self._user_with_tweets(username1, max_tweets),
+            self._user_with_tweets(username2, max_tweets)
+        )
+
+        if not user1_info or not user2_info:
+            return None
+
+        return {
+            'user1': {'info': user1_info, 'tweets': user1_tweets},
+            'user2': {'info': user2_info, 'tweets': user2_tweets}
+        }
@@ -0,0 +1,55 @@
+"""
+Micro-benchmark: the original five-re.sub clean_text vs TextNormalizer
+
+    python benchmarks/bench_clean_text.py --number 100000
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_analyzer import TextNormalizer
+
+# A typical tweet: ~110 chars with a mention, a hashtag, a URL and punctuation
+TWEET = "@jane_doe Loving the new release!!! Check it out -> https://t.co/xYz123AbC #python #release :) so good"
+
+
+def legacy_clean_text(text):
+    """clean_text as it was before TextNormalizer"""
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'@\w+', '', text)
+    text = re.sub(r'#', '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.lower()
+
+
+def bench(function, text, number, repeat):
+    """Best per-call time in microseconds"""
+    return min(timeit.repeat(lambda: function(text), number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time clean_text implementations on one tweet")
+    parser.add_argument('--number', type=int, default=100000, help="Calls per timing run")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing runs; the best one is reported")
+    parser.add_argument('--text', default=TWEET)
+    args = parser.parse_args()
+
+    normalizer = TextNormalizer()
+    if normalizer(args.text) != legacy_clean_text(args.text):
+        parser.error("implementations disagree on --text")
+
+    legacy = bench(legacy_clean_text, args.text, args.number, args.repeat)
+    compiled = bench(normalizer, args.text, args.number, args.repeat)
+    print(f"text: {len(args.text)} chars, best of {args.repeat} x {args.number} calls")
+    print(f"  legacy clean_text  {legacy:6.2f} us")
+    print(f"  TextNormalizer     {compiled:6.2f} us  ({legacy / compiled:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
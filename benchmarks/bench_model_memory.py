@@ -0,0 +1,109 @@
+"""
+Memory per worker for each way of loading the sentiment model (Linux)
+
+Forks N workers per mode, like gunicorn without --preload. Each one loads the
+model, scores a batch and touches every weight page, then all of them report
+process_memory() at the same moment, so pss charges the pages a mapped bundle
+shares 1/N to each worker.
+
+    python benchmarks/bench_model_memory.py --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from model_bundle import process_memory
+from sentiment_analyzer import SentimentAnalyzer
+
+MODES = {
+    'pickles': {'engine': 'sklearn'},
+    'bundle (copied)': {'engine': 'numpy', 'mmap': False},
+    'bundle (mmap)': {'engine': 'numpy', 'mmap': True}
+}
+
+TEXTS = [
+    "I absolutely love this new phone, best purchase ever!!!",
+    "Worst customer service I've ever had. Never again.",
+    "The game was okay... not great, not terrible",
+] * 100
+
+
+def load(args, mode):
+    """A SentimentAnalyzer for mode, its start-up messages silenced"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return SentimentAnalyzer(args.model_path, args.vectorizer_path, bundle_path=args.bundle_path,
+                                 cache_size=0, **MODES[mode])
+
+
+def touch(analyzer):
+    """Read every page of the model's arrays, as long-running workers eventually do"""
+    if analyzer.engine is not None:
+        float(analyzer.engine.weights.sum() + analyzer.engine.idf.sum())
+    else:
+        float(analyzer.model.coef_.sum() + analyzer.vectorizer.idf_.sum())
+
+
+def worker(args, mode, loaded, results):
+    before = process_memory()
+    analyzer = load(args, mode)
+    analyzer.predict_batch(TEXTS)
+    touch(analyzer)
+    # Measure only once every worker holds its model
+    loaded.wait()
+    after = process_memory()
+    results.put({
+        'private_mb': after['private_mb'],
+        'pss_mb': after['pss_mb'],
+        'model_private_mb': after['private_mb'] - before['private_mb']
+    })
+
+
+def measure(args, mode):
+    context = multiprocessing.get_context('fork')
+    loaded = context.Barrier(args.workers)
+    results = context.Queue()
+    workers = [context.Process(target=worker, args=(args, mode, loaded, results)) for _ in range(args.workers)]
+    for process in workers:
+        process.start()
+    usage = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    return {key: statistics.mean(row[key] for row in usage) for key in usage[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory of each model loading mode")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--model-path', default=os.path.join(ROOT, 'trained_model.sav'))
+    parser.add_argument('--vectorizer-path', default=os.path.join(ROOT, 'vectorizer.pkl'))
+    parser.add_argument('--bundle-path', help="Bundle to load (default: exported to a temporary file)")
+    args = parser.parse_args()
+
+    if process_memory() is None:
+        parser.error("/proc/self/smaps_rollup is not available; this benchmark needs Linux")
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.bundle_path is None:
+            args.bundle_path = os.path.join(directory, 'model_bundle.npz')
+            # Exports the bundle once, before any worker is forked
+            load(args, 'bundle (copied)')
+
+        print(f"{args.workers} forked workers, mean per worker (MB)")
+        print(f"  {'mode':<18}{'private':>10}{'pss':>10}{'model private':>16}")
+        for mode in MODES:
+            usage = measure(args, mode)
+            print(f"  {mode:<18}{usage['private_mb']:>10.1f}{usage['pss_mb']:>10.1f}"
+                  f"{usage['model_private_mb']:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Bucketing Module - Vectorized time and confidence buckets for the sentiment charts
+
+Timestamps are converted once into a datetime64 array of wall-clock times in
+the requested timezone, sentiments into small integer codes, and every count
+is a single np.bincount over bucket index x sentiment code; nothing formats
+or looks up a dict per tweet:
+
+    times = local_times([t['created_at'] for t in tweets], 'Europe/Berlin')
+    codes = sentiment_codes([t['sentiment'] for t in tweets])
+    counts = time_bucket_counts(times, codes, granularity='hour')
+
+ConfidenceHistogram keeps fixed-bin confidence counts per sentiment; two
+histograms with the same edges add up, so batches or workers can each build
+one and the totals never need the tweets again.
+"""
+
+import numpy as np
+import pandas as pd
+
+SENTIMENTS = ('positive', 'neutral', 'negative')
+
+GRANULARITIES = ('minute', 'hour', 'day', 'week')
+
+# datetime64 unit each granularity truncates to, and the unit of its label
+_BUCKET_UNITS = {'minute': 'm', 'hour': 'h', 'day': 'D', 'week': 'D'}
+_LABEL_UNITS = {'minute': 'm', 'hour': 'm', 'day': 'D', 'week': 'D'}
+
+# Inner confidence bin edges in percent: 0-20, 20-40, 40-60, 60-80, 80-100
+DEFAULT_CONFIDENCE_EDGES = (20, 40, 60, 80)
+
+
+def sentiment_codes(sentiments):
+    """
+    Per label: index into SENTIMENTS (case-insensitive), -1 for any other label
+    sentiments: list of labels or a pandas Categorical/Series
+    """
+    if isinstance(getattr(sentiments, 'dtype', None), pd.CategoricalDtype):
+        labels = pd.Categorical(sentiments)
+        index, labels = labels.codes, labels.categories
+    else:
+        index, labels = pd.factorize(np.asarray(sentiments, dtype=object))
+    # Trailing -1 is what missing values (index -1) pick up
+    lookup = [SENTIMENTS.index(c.lower()) if c.lower() in SENTIMENTS else -1 for c in labels]
+    return np.array(lookup + [-1], dtype=np.int64)[index]
+
+
+def local_times(created_at, timezone=None):
+    """
+    Timestamps as naive datetime64 wall-clock times, NaT where missing
+    created_at: datetimes, a datetime64 array/Series or DatetimeIndex; naive
+    values are taken as UTC
+    timezone: IANA name (e.g. 'Asia/Kolkata') or tzinfo; None keeps UTC
+    """
+    try:
+        # datetime64 input, or datetimes that are all naive or all aware
+        times = pd.DatetimeIndex(created_at)
+    except (TypeError, ValueError):
+        times = pd.DatetimeIndex(pd.to_datetime(created_at, utc=True))
+    if times.tz is None:
+        times = times.tz_localize('UTC')
+    return times.tz_convert(timezone or 'UTC').tz_localize(None).to_numpy()
+
+
+def truncate(times, granularity='day'):
+    """
+    Start of each time's bucket; weeks start on Monday
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}', expected one of {', '.join(GRANULARITIES)}")
+
+    buckets = times.astype(f'datetime64[{_BUCKET_UNITS[granularity]}]')
+    if granularity == 'week':
+        # Day 0 (1970-01-01) was a Thursday, i.e. 3 days after a Monday
+        buckets = buckets - (buckets.astype(np.int64) + 3) % 7
+    return buckets
+
+
+def time_bucket_counts(times, codes, granularity='day'):
+    """
+    Tweets per time bucket and sentiment, for buckets that have tweets
+    times / codes: local_times() and sentiment_codes() of the same tweets
+    Returns: {label: {'positive', 'neutral', 'negative', 'total'}}; labels
+             ('2024-01-01', or '2024-01-01T13:00' for hour/minute) sort in
+             time order, and total also counts tweets with other labels
+    """
+    dated = ~np.isnat(times)
+    buckets = truncate(times[dated], granularity)
+    if not len(buckets):
+        return {}
+
+    # Other labels (-1) go to an extra column that only feeds the total
+    columns = len(SENTIMENTS) + 1
+    codes = np.where(codes[dated] < 0, len(SENTIMENTS), codes[dated])
+    unique_buckets, index = np.unique(buckets, return_inverse=True)
+    counts = np.bincount(
+        index * columns + codes, minlength=len(unique_buckets) * columns
+    ).reshape(len(unique_buckets), columns)
+
+    labels = np.datetime_as_string(unique_buckets.astype(f'datetime64[{_LABEL_UNITS[granularity]}]'))
+    return {
+        str(label): {**dict(zip(SENTIMENTS, row)), 'total': sum(row)}
+        for label, row in zip(labels, counts.tolist())
+    }
+
+
+def hour_of_day_counts(times, codes):
+    """
+    Tweets per hour of day and sentiment; tweets with other labels are skipped
+    Returns: {0..23: {'positive', 'neutral', 'negative'}}
+    """
+    keep = ~np.isnat(times) & (codes >= 0)
+    times = times[keep]
+    hours = (times.astype('datetime64[h]') - times.astype('datetime64[D]')).astype(np.int64)
+    counts = np.bincount(
+        hours * len(SENTIMENTS) + codes[keep], minlength=24 * len(SENTIMENTS)
+    ).reshape(24, len(SENTIMENTS))
+    return {hour: dict(zip(SENTIMENTS, row)) for hour, row in enumerate(counts.tolist())}
+
+
+class ConfidenceHistogram:
+    """
+    Confidence counts per fixed bin, kept separately for each sentiment
+
+    edges: inner bin edges in percent, increasing; an edge belongs to the bin
+    below it (20% is in 0-20%). Rows of counts are SENTIMENTS plus one for
+    any other label. Histograms with equal edges merge with merge() or +,
+    and to_dict()/from_dict() carry one between processes as JSON.
+    """
+    def __init__(self, edges=DEFAULT_CONFIDENCE_EDGES):
+        edges = np.asarray(edges, dtype=np.float64)
+        if edges.ndim != 1 or np.any(np.diff(edges) <= 0) or np.any((edges <= 0) | (edges >= 100)):
+            raise ValueError(f"Confidence bin edges must increase strictly within (0, 100), got {edges.tolist()}")
+        self.edges = edges
+        self.counts = np.zeros((len(SENTIMENTS) + 1, len(edges) + 1), dtype=np.int64)
+
+    def add(self, confidences, codes=None):
+        """
+        Count a batch of confidences (0-1)
+        codes: sentiment_codes() of the same tweets; without them every
+        tweet counts as 'other', so only totals() is meaningful
+        Returns: self
+        """
+        confidences = np.asarray(confidences)
+        if confidences.dtype.kind != 'f':
+            confidences = confidences.astype(np.float64)
+        # Edges in the confidences' own precision: a float32 0.2 then sits on
+        # the 20% edge exactly as a float64 0.2 does
+        bins = np.digitize(confidences, (self.edges / 100).astype(confidences.dtype), right=True)
+        if codes is None:
+            rows = np.full(len(bins), len(SENTIMENTS))
+        else:
+            rows = np.where(codes < 0, len(SENTIMENTS), codes)
+        self.counts += np.bincount(
+            rows * self.counts.shape[1] + bins, minlength=self.counts.size
+        ).reshape(self.counts.shape)
+        return self
+
+    def merge(self, other):
+        """
+        Add another histogram's counts into this one
+        Raises: ValueError if the bin edges differ
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError(f"Cannot merge histograms with edges {self.edges.tolist()} and {other.edges.tolist()}")
+        self.counts += other.counts
+        return self
+
+    def __add__(self, other):
+        return ConfidenceHistogram(self.edges).merge(self).merge(other)
+
+    def labels(self):
+        """Bin labels, e.g. ['0-20%', ..., '80-100%']"""
+        bounds = [0, *self.edges.tolist(), 100]
+        return [f"{low:g}-{high:g}%" for low, high in zip(bounds, bounds[1:])]
+
+    def totals(self):
+        """Counts per bin over every tweet"""
+        return self.counts.sum(axis=0).tolist()
+
+    def by_sentiment(self):
+        """Counts per bin for each of SENTIMENTS"""
+        return {sentiment: row.tolist() for sentiment, row in zip(SENTIMENTS, self.counts)}
+
+    def to_dict(self):
+        return {'edges': self.edges.tolist(), 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['edges'])
+        histogram.counts += np.asarray(data['counts'], dtype=np.int64)
+        return histogram
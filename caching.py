@@ -0,0 +1,278 @@
+"""
+Caching Module - Caches shared by the analyzer and API client
+
+LRUCache lives in one process; SQLiteCache has the same get/set interface
+but keeps entries in a file, so every gunicorn worker shares its hits.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+def make_key(kind, *args):
+    """
+    Stable cache key for a call: kind plus its arguments as compact JSON
+    Identical across processes, unlike hash(), so it works as a SQLite key
+    """
+    return f"{kind}:{json.dumps(args, default=str, separators=(',', ':'))}"
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with an optional per-entry TTL
+    Keeps hit/miss/eviction counters for the metrics endpoints
+    """
+    def __init__(self, maxsize=10000, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Return the cached value, or default on a miss or an expired entry"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value; ttl overrides the cache default for this entry
+        None means no expiry; a ttl of 0 or less stores nothing (and drops any old entry)
+        """
+        ttl = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            if ttl is not None and ttl <= 0:
+                self._data.pop(key, None)
+                return
+            expires_at = time.monotonic() + ttl if ttl is not None else None
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Counters and size, e.g. for /health"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def _encode_value(value):
+    """JSON default hook: datetimes become tagged ISO 8601 strings"""
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    raise TypeError(f"{type(value).__name__} values cannot be cached on disk")
+
+
+def _decode_value(obj):
+    """JSON object hook reversing _encode_value"""
+    if len(obj) == 1 and '$datetime' in obj:
+        return datetime.fromisoformat(obj['$datetime'])
+    return obj
+
+
+class SQLiteCache:
+    """
+    On-disk cache with per-entry TTL, shared by every process using the same file
+    Values are stored as JSON (datetimes as ISO 8601), never pickled: anyone able
+    to write the file can change cached data but cannot run code in the workers
+    Expired rows read as misses and are pruned periodically
+    Cache errors never fail the caller - they are reported and count as misses
+    """
+    PRUNE_EVERY = 100
+
+    def __init__(self, path, ttl=None):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'
+        )
+
+    def _connect(self):
+        """One connection per thread and process (connections must not cross a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def get(self, key, default=None):
+        """Return the cached value, or default on a miss or an expired entry"""
+        try:
+            row = self._connect().execute(
+                'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Response cache error: {e}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        try:
+            value = json.loads(value, object_hook=_decode_value)
+        except (TypeError, ValueError) as e:
+            # Rows written by another format (e.g. an older pickled cache)
+            print(f"Response cache error: {e}")
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value; ttl overrides the cache default for this entry
+        None means no expiry; a ttl of 0 or less stores nothing (and drops any old entry)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        try:
+            if ttl is not None and ttl <= 0:
+                self._connect().execute('DELETE FROM cache WHERE key = ?', (key,))
+                return
+            encoded = json.dumps(value, default=_encode_value, separators=(',', ':'))
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, encoded, expires_at)
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                pruned = conn.execute('DELETE FROM cache WHERE expires_at <= ?', (now,)).rowcount
+                self.evictions += max(pruned, 0)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Response cache error: {e}")
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache')
+
+    def stats(self):
+        """Counters and size, e.g. for /health (counters are per process)"""
+        lookups = self.hits + self.misses
+        try:
+            size = len(self)
+        except sqlite3.Error:
+            size = None
+        return {
+            'path': self.path,
+            'size': size,
+            'maxsize': None,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution
+    The first caller (the leader) runs the function; callers arriving while it
+    is in flight wait for it and receive the same result or exception
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, function, *args, **kwargs):
+        """Run function(*args, **kwargs) once per in-flight key and share its outcome"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+                self.leaders += 1
+                leader = True
+            else:
+                self.followers += 1
+                leader = False
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = function(*args, **kwargs)
+            return call['result']
+        except BaseException as e:
+            call['error'] = e
+            raise
+        finally:
+            # Later callers start a fresh flight; waiters already hold this one
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+
+    def stats(self):
+        """In-flight keys and leader/follower counters, e.g. for /health"""
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'followers': self.followers
+        }
@@ -0,0 +1,185 @@
+"""
+Columnar Module - Analyzed tweets as columns instead of a list of dicts
+
+AnalyzedTweets keeps one pandas DataFrame per result set: int64 ids and
+metrics, datetime64 (UTC) timestamps, a categorical sentiment and float32
+confidence. Stats, categories, top-k and chart buckets are computed with
+vectorized NumPy over those columns, and only the rows a response actually
+returns are turned back into dicts:
+
+    analyzed = sentiment_analyzer.analyze_tweets(tweets, columnar=True)
+    stats = sentiment_analyzer.get_sentiment_stats(analyzed)
+    chart = DataVisualizer.prepare_timeline_chart(analyzed)
+"""
+
+import itertools
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from bucketing import (
+    DEFAULT_CONFIDENCE_EDGES, SENTIMENTS, ConfidenceHistogram, hour_of_day_counts, local_times, sentiment_codes,
+    time_bucket_counts
+)
+from ranking import top_k_indices
+
+# Integer columns, when the tweets carry them; anything else is kept as object
+INT_COLUMNS = ('id', 'likes', 'retweets', 'replies', 'impressions', 'author_id')
+
+
+class AnalyzedTweets:
+    """
+    Column-oriented analyzed tweets with vectorized aggregations
+    Same fields as the dicts analyze_tweets returns, one column each
+    """
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self._engagement = None
+        self._sentiment_codes = None
+
+    @classmethod
+    def from_records(cls, tweets, sentiments=None, confidences=None, cleaned=None):
+        """
+        Build from tweet dicts
+        sentiments / confidences / cleaned: per-tweet analysis results; taken
+        from the dicts' own keys when omitted (already analyzed tweets)
+        """
+        tweets = list(tweets)
+        n = len(tweets)
+        if sentiments is None:
+            sentiments = [t['sentiment'] for t in tweets]
+        if confidences is None:
+            confidences = [t['confidence'] for t in tweets]
+        if cleaned is None:
+            cleaned = [t.get('cleaned_text') for t in tweets]
+
+        keys = {}
+        for tweet in tweets:
+            keys.update(dict.fromkeys(tweet))
+        for key in ('sentiment', 'confidence', 'cleaned_text'):
+            keys.pop(key, None)
+
+        columns = {}
+        for key in keys:
+            if key in INT_COLUMNS:
+                columns[key] = np.fromiter((t.get(key) or 0 for t in tweets), dtype=np.int64, count=n)
+            elif key == 'created_at':
+                columns[key] = pd.to_datetime([t.get(key) for t in tweets], utc=True)
+            else:
+                values = np.empty(n, dtype=object)
+                values[:] = [t.get(key) for t in tweets]
+                columns[key] = values
+
+        columns['sentiment'] = pd.Categorical(sentiments)
+        columns['confidence'] = np.asarray(confidences, dtype=np.float32)
+        columns['cleaned_text'] = np.asarray(cleaned, dtype=object)
+        return cls(pd.DataFrame(columns, index=pd.RangeIndex(n)))
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _column(self, name):
+        """Column as a NumPy array, zeros if the tweets do not have it"""
+        if name not in self.frame:
+            return np.zeros(len(self.frame), dtype=np.int64)
+        return self.frame[name].to_numpy()
+
+    @property
+    def engagement(self):
+        """likes + retweets per tweet, computed once"""
+        if self._engagement is None:
+            self._engagement = self._column('likes') + self._column('retweets')
+        return self._engagement
+
+    @property
+    def sentiment_codes(self):
+        """Per tweet: index into SENTIMENTS, or -1 for any other label"""
+        if self._sentiment_codes is None:
+            self._sentiment_codes = sentiment_codes(self.frame['sentiment'])
+        return self._sentiment_codes
+
+    def to_records(self, rows=None):
+        """
+        Rows as plain dicts (Python ints/floats/datetimes), e.g. for JSON
+        rows: positional indices in the wanted order; all rows when None
+        """
+        frame = self.frame if rows is None else self.frame.iloc[rows]
+        columns = []
+        for name in frame.columns:
+            column = frame[name]
+            if name == 'created_at':
+                missing = column.isna().to_numpy()
+                values = column.array.to_pydatetime().tolist()
+                values = [None if m else v for v, m in zip(values, missing)]
+            else:
+                values = column.tolist()
+            columns.append(values)
+        names = list(frame.columns)
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+    def sentiment_stats(self):
+        """Same dict as SentimentAnalyzer.get_sentiment_stats"""
+        total = len(self)
+        if not total:
+            return None
+
+        counts = self.frame['sentiment'].value_counts()
+        positive = int(counts.get('Positive', 0))
+        neutral = int(counts.get('Neutral', 0))
+        negative = int(counts.get('Negative', 0))
+        return {
+            'total': total,
+            'positive': positive,
+            'neutral': neutral,
+            'negative': negative,
+            'positive_pct': round((positive / total) * 100, 2),
+            'neutral_pct': round((neutral / total) * 100, 2),
+            'negative_pct': round((negative / total) * 100, 2),
+            'avg_confidence': round(float(self._column('confidence').sum(dtype=np.float64)) / total, 4)
+        }
+
+    def categorize(self, limit=None):
+        """
+        Same structure as SentimentAnalyzer.categorize_tweets
+        limit: keep only the limit highest-engagement tweets of each category
+        """
+        codes = self.sentiment_codes
+        categorized = {}
+        for code, sentiment in enumerate(SENTIMENTS):
+            rows = np.flatnonzero(codes == code)
+            categorized[sentiment] = self.to_records(rows[top_k_indices(self.engagement[rows], limit)])
+        return categorized
+
+    def top(self, n=10, sort_by='engagement'):
+        """Same as SentimentAnalyzer.get_top_tweets"""
+        if not len(self):
+            return []
+        key = self.engagement if sort_by == 'engagement' else self._column(sort_by)
+        return self.to_records(top_k_indices(key, n))
+
+    def _local_times(self, timezone):
+        if 'created_at' not in self.frame:
+            return np.full(len(self), np.datetime64('NaT'), dtype='datetime64[us]')
+        return local_times(self.frame['created_at'], timezone)
+
+    def time_bucket_counts(self, granularity='day', timezone=None):
+        """Per-bucket sentiment counts, as bucketing.time_bucket_counts"""
+        return time_bucket_counts(self._local_times(timezone), self.sentiment_codes, granularity)
+
+    def hour_of_day_counts(self, timezone=None):
+        """Per-hour sentiment counts, as bucketing.hour_of_day_counts"""
+        return hour_of_day_counts(self._local_times(timezone), self.sentiment_codes)
+
+    def confidence_histogram(self, edges=DEFAULT_CONFIDENCE_EDGES):
+        """Per-sentiment bucketing.ConfidenceHistogram of the confidences"""
+        return ConfidenceHistogram(edges).add(self._column('confidence'), self.sentiment_codes)
+
+    def hashtag_counts(self):
+        """Counter of hashtags over every tweet"""
+        if 'hashtags' not in self.frame:
+            return Counter()
+        return Counter(itertools.chain.from_iterable(
+            hashtags if isinstance(hashtags, list) else hashtags.split(', ')
+            for hashtags in self.frame['hashtags'].tolist() if hashtags
+        ))
@@ -5,8 +5,15 @@ Data Visualizer Module - Generates chart data for frontend
 from datetime import datetime
 from collections import Counter
 
+from bucketing import DEFAULT_CONFIDENCE_EDGES, ConfidenceHistogram, hour_of_day_counts, local_times, sentiment_codes, time_bucket_counts
+from columnar import AnalyzedTweets
+from ranking import top_k
+
 
 class DataVisualizer:
+    CONFIDENCE_BIN_EDGES = list(DEFAULT_CONFIDENCE_EDGES)
+    CONFIDENCE_BIN_COLORS = ['#f56565', '#ed8936', '#ecc94b', '#48bb78', '#38a169']
+    
     @staticmethod
     def prepare_sentiment_pie_chart(sentiment_stats):
         """
@@ -79,25 +86,32 @@ class DataVisualizer:
         }
     
     @staticmethod
-    def prepare_timeline_chart(analyzed_tweets):
+    def prepare_timeline_chart(analyzed_tweets, granularity='day', timezone=None):
         """
         Prepare data for sentiment over time
+        granularity: 'minute', 'hour', 'day' or 'week' (from Monday) buckets
+        timezone: IANA name (e.g. 'Asia/Kolkata') the buckets follow; None for UTC
         """
         if not analyzed_tweets:
             return None
         
-        # Group by date
-        daily_data = {}
-        for tweet in analyzed_tweets:
-            date = tweet['created_at'].strftime('%Y-%m-%d')
-            if date not in daily_data:
-                daily_data[date] = {'positive': 0, 'neutral': 0, 'negative': 0, 'total': 0}
-            
-            sentiment = tweet['sentiment'].lower()
-            daily_data[date][sentiment] = daily_data[date].get(sentiment, 0) + 1
-            daily_data[date]['total'] += 1
+        if isinstance(analyzed_tweets, AnalyzedTweets):
+            counts = analyzed_tweets.time_bucket_counts(granularity, timezone)
+        else:
+            times = local_times([t.get('created_at') for t in analyzed_tweets], timezone)
+            codes = sentiment_codes([t['sentiment'] for t in analyzed_tweets])
+            counts = time_bucket_counts(times, codes, granularity)
         
-        # Sort by date
+        return DataVisualizer.timeline_chart_from_counts(counts)
+    
+    @staticmethod
+    def timeline_chart_from_counts(daily_data):
+        """
+        Timeline chart payload from per-bucket counts
+        daily_data: {label: {'positive': n, 'neutral': n, 'negative': n}}, labels
+        that sort in time order ('YYYY-MM-DD', 'YYYY-MM-DDTHH:MM')
+        """
+        # Sort by time
         sorted_dates = sorted(daily_data.keys())
         
         return {
@@ -135,13 +149,16 @@ class DataVisualizer:
         if not analyzed_tweets:
             return None
         
-        # Sort by engagement
-        sorted_tweets = sorted(
-            analyzed_tweets,
-            key=lambda x: x.get('likes', 0) + x.get('retweets', 0),
-            reverse=True
-        )[:top_n]
+        if isinstance(analyzed_tweets, AnalyzedTweets):
+            return DataVisualizer.engagement_chart_from_tweets(analyzed_tweets.top(top_n))
         
+        return DataVisualizer.engagement_chart_from_tweets(top_k(analyzed_tweets, top_n))
+    
+    @staticmethod
+    def engagement_chart_from_tweets(sorted_tweets):
+        """
+        Engagement chart payload from tweets already ranked by engagement
+        """
         labels = [f"Tweet {i+1}" for i in range(len(sorted_tweets))]
         
         return {
@@ -167,40 +184,51 @@ class DataVisualizer:
         }
     
     @staticmethod
-    def prepare_confidence_distribution(analyzed_tweets):
+    def prepare_confidence_distribution(analyzed_tweets, edges=None, by_sentiment=False):
         """
         Prepare data for confidence score distribution
+        edges: inner bin edges in percent (default CONFIDENCE_BIN_EDGES); an
+        edge belongs to the bin below it
+        by_sentiment: also return the counts of each sentiment under 'by_sentiment'
         """
         if not analyzed_tweets:
             return None
         
-        # Create bins
-        bins = {
-            '0-20%': 0,
-            '20-40%': 0,
-            '40-60%': 0,
-            '60-80%': 0,
-            '80-100%': 0
-        }
-        
-        for tweet in analyzed_tweets:
-            confidence = tweet['confidence'] * 100
-            if confidence <= 20:
-                bins['0-20%'] += 1
-            elif confidence <= 40:
-                bins['20-40%'] += 1
-            elif confidence <= 60:
-                bins['40-60%'] += 1
-            elif confidence <= 80:
-                bins['60-80%'] += 1
-            else:
-                bins['80-100%'] += 1
+        histogram = DataVisualizer.confidence_histogram(analyzed_tweets, edges, by_sentiment)
+        return DataVisualizer.confidence_chart_from_histogram(histogram, by_sentiment)
+    
+    @staticmethod
+    def confidence_histogram(analyzed_tweets, edges=None, by_sentiment=True):
+        """
+        ConfidenceHistogram of analyzed tweets (dicts or AnalyzedTweets)
+        by_sentiment: False skips labelling the dicts' sentiments when only totals are needed
+        Histograms of several batches can be merged before charting
+        """
+        if edges is None:
+            edges = DataVisualizer.CONFIDENCE_BIN_EDGES
+        if isinstance(analyzed_tweets, AnalyzedTweets):
+            return analyzed_tweets.confidence_histogram(edges)
         
-        return {
-            'labels': list(bins.keys()),
-            'data': list(bins.values()),
-            'backgroundColor': ['#f56565', '#ed8936', '#ecc94b', '#48bb78', '#38a169']
+        codes = sentiment_codes([t['sentiment'] for t in analyzed_tweets]) if by_sentiment else None
+        return ConfidenceHistogram(edges).add([t['confidence'] for t in analyzed_tweets], codes)
+    
+    @staticmethod
+    def confidence_chart_from_histogram(histogram, by_sentiment=False):
+        """
+        Confidence distribution payload from a ConfidenceHistogram with any bins
+        by_sentiment: add {'positive': [...], 'neutral': [...], 'negative': [...]}
+        """
+        # Spread the low-to-high palette over however many bins there are
+        colors = DataVisualizer.CONFIDENCE_BIN_COLORS
+        bins = len(histogram.edges) + 1
+        chart = {
+            'labels': histogram.labels(),
+            'data': histogram.totals(),
+            'backgroundColor': [colors[i * (len(colors) - 1) // max(bins - 1, 1)] for i in range(bins)]
         }
+        if by_sentiment:
+            chart['by_sentiment'] = histogram.by_sentiment()
+        return chart
     
     @staticmethod
     def prepare_hashtag_chart(analyzed_tweets, top_n=10):
@@ -210,6 +238,9 @@ class DataVisualizer:
         if not analyzed_tweets:
             return None
         
+        if isinstance(analyzed_tweets, AnalyzedTweets):
+            return DataVisualizer.hashtag_chart_from_counts(analyzed_tweets.hashtag_counts(), top_n)
+        
         all_hashtags = []
         for tweet in analyzed_tweets:
             if 'hashtags' in tweet and tweet['hashtags']:
@@ -218,10 +249,17 @@ class DataVisualizer:
                 else:
                     all_hashtags.extend(tweet['hashtags'].split(', '))
         
-        if not all_hashtags:
+        return DataVisualizer.hashtag_chart_from_counts(Counter(all_hashtags), top_n)
+    
+    @staticmethod
+    def hashtag_chart_from_counts(hashtag_counter, top_n=10):
+        """
+        Top hashtags payload from a Counter of hashtag occurrences
+        """
+        if not hashtag_counter:
             return None
         
-        hashtag_counts = Counter(all_hashtags).most_common(top_n)
+        hashtag_counts = hashtag_counter.most_common(top_n)
         
         return {
             'labels': [f"#{tag}" for tag, _ in hashtag_counts],
@@ -259,22 +297,28 @@ class DataVisualizer:
         }
     
     @staticmethod
-    def prepare_sentiment_by_hour(analyzed_tweets):
+    def prepare_sentiment_by_hour(analyzed_tweets, timezone=None):
         """
         Prepare data for sentiment distribution by hour of day
+        timezone: IANA name the hours are read in; None for UTC
+        Tweets labelled anything but positive/neutral/negative are skipped
         """
         if not analyzed_tweets:
             return None
         
-        hourly_data = {}
-        for i in range(24):
-            hourly_data[i] = {'positive': 0, 'neutral': 0, 'negative': 0}
-        
-        for tweet in analyzed_tweets:
-            hour = tweet['created_at'].hour
-            sentiment = tweet['sentiment'].lower()
-            hourly_data[hour][sentiment] += 1
+        if isinstance(analyzed_tweets, AnalyzedTweets):
+            return DataVisualizer.hourly_chart_from_counts(analyzed_tweets.hour_of_day_counts(timezone))
         
+        times = local_times([t.get('created_at') for t in analyzed_tweets], timezone)
+        codes = sentiment_codes([t['sentiment'] for t in analyzed_tweets])
+        return DataVisualizer.hourly_chart_from_counts(hour_of_day_counts(times, codes))
+    
+    @staticmethod
+    def hourly_chart_from_counts(hourly_data):
+        """
+        Sentiment-by-hour payload from per-hour counts
+        hourly_data: {0..23: {'positive': n, 'neutral': n, 'negative': n}}
+        """
         return {
             'labels': [f"{h:02d}:00" for h in range(24)],
             'datasets': [
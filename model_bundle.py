@@ -0,0 +1,207 @@
+"""
+Model Bundle Module - Compact on-disk format for the sentiment model
+
+A bundle is an uncompressed .npz holding everything LinearScoringEngine needs:
+    term_hashes  uint64 (n_features,)            sorted 64-bit term hashes
+    idf          float32 (n_features,)           idf weight per term
+    weights      float32 (n_features, n_outputs) model coefficients per term
+    intercept    float64 (n_outputs,)
+    classes      (n_classes,)                    model.classes_
+    meta         str                             JSON vectorizer/model settings
+
+Loading it is a handful of flat array reads instead of unpickling a
+460k-entry Python dict, which is what dominates worker start-up. With
+mmap=True the arrays are mapped read-only straight from the file, so all
+gunicorn workers share one copy of the pages.
+
+Export:
+    python model_bundle.py trained_model.sav vectorizer.pkl model_bundle.npz
+"""
+
+import argparse
+import json
+import os
+import pickle
+import struct
+import tempfile
+import zipfile
+
+import numpy as np
+
+from scoring_engine import HashedVocabulary, LinearScoringEngine, term_hash
+
+BUNDLE_VERSION = 1
+
+
+def export_bundle(model, vectorizer, bundle_path):
+    """
+    Write the fitted vectorizer + model to a bundle at bundle_path
+    The file is replaced atomically so concurrent workers never see a partial one
+    """
+    engine = LinearScoringEngine.from_sklearn(model, vectorizer)
+
+    terms = list(vectorizer.vocabulary_)
+    columns = np.fromiter((vectorizer.vocabulary_[t] for t in terms), dtype=np.int64, count=len(terms))
+    hashes = np.fromiter((term_hash(t) for t in terms), dtype=np.uint64, count=len(terms))
+
+    order = np.argsort(hashes)
+    hashes = hashes[order]
+    if np.any(hashes[1:] == hashes[:-1]):
+        raise ValueError("Term hash collision in vocabulary; cannot build bundle")
+    columns = columns[order]
+
+    meta = {
+        'version': BUNDLE_VERSION,
+        'token_pattern': engine.token_re.pattern,
+        'lowercase': engine.lowercase,
+        'norm': engine.norm,
+        'sublinear_tf': engine.sublinear_tf,
+        'multinomial': engine.multinomial
+    }
+
+    directory = os.path.dirname(os.path.abspath(bundle_path))
+    fd, tmp_path = tempfile.mkstemp(suffix='.npz', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(
+                f,
+                term_hashes=hashes,
+                idf=engine.idf[columns].astype(np.float32),
+                weights=np.ascontiguousarray(engine.weights[columns], dtype=np.float32),
+                intercept=engine.intercept,
+                classes=engine.classes_,
+                meta=np.array(json.dumps(meta))
+            )
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, bundle_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_bundle(bundle_path, mmap=False):
+    """
+    Load a bundle written by export_bundle
+    mmap: map the arrays read-only from the file instead of copying them, so
+          every worker process shares the same physical pages
+    Returns: LinearScoringEngine
+    """
+    if mmap:
+        data = _map_npz(bundle_path)
+    else:
+        with np.load(bundle_path, allow_pickle=False) as archive:
+            data = {name: archive[name] for name in archive.files}
+
+    meta = json.loads(str(data['meta']))
+    if meta.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported bundle version {meta.get('version')!r}")
+
+    return LinearScoringEngine(
+        vocabulary=HashedVocabulary(data['term_hashes']),
+        idf=data['idf'],
+        weights=data['weights'],
+        intercept=data['intercept'],
+        classes=data['classes'],
+        token_pattern=meta['token_pattern'],
+        lowercase=meta['lowercase'],
+        norm=meta['norm'],
+        sublinear_tf=meta['sublinear_tf'],
+        multinomial=meta['multinomial']
+    )
+
+
+def _map_npz(path):
+    """
+    Memory-map every array of an uncompressed .npz in place
+
+    np.savez stores members uncompressed, so each .npy payload is a contiguous
+    byte range of the zip file; scalars and empty arrays are simply read.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} is compressed and cannot be memory-mapped")
+
+            # The local file header repeats the name and has its own extra field
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            name = info.filename[:-len('.npy')]
+            if dtype.hasobject:
+                raise ValueError(f"{name} holds Python objects and cannot be memory-mapped")
+            if not shape or 0 in shape:
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                    order='F' if fortran_order else 'C'
+                )
+    return arrays
+
+
+def process_memory():
+    """
+    Memory of the current process in MB, from /proc/self/smaps_rollup (Linux)
+    pss charges shared pages (e.g. a mapped bundle) 1/N to each of N processes,
+    so summing it over workers gives their real combined footprint
+    Returns: dict with rss/pss/shared/private, or None where unavailable
+    """
+    fields = {
+        'Rss': 'rss_mb',
+        'Pss': 'pss_mb',
+        'Shared_Clean': 'shared_mb',
+        'Shared_Dirty': 'shared_mb',
+        'Private_Clean': 'private_mb',
+        'Private_Dirty': 'private_mb'
+    }
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    usage = dict.fromkeys(fields.values(), 0.0)
+    for line in lines:
+        key, _, value = line.partition(':')
+        if key in fields:
+            usage[fields[key]] += int(value.split()[0]) / 1024
+    return {key: round(value, 1) for key, value in usage.items()}
+
+
+def bundle_is_current(bundle_path, *source_paths):
+    """
+    True if the bundle exists and is at least as new as every source file that exists
+    """
+    if not os.path.exists(bundle_path):
+        return False
+    bundle_mtime = os.path.getmtime(bundle_path)
+    return all(
+        os.path.getmtime(path) <= bundle_mtime
+        for path in source_paths if os.path.exists(path)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the sentiment model to a compact bundle")
+    parser.add_argument('model_path')
+    parser.add_argument('vectorizer_path')
+    parser.add_argument('bundle_path')
+    args = parser.parse_args()
+
+    model = pickle.load(open(args.model_path, 'rb'))
+    vectorizer = pickle.load(open(args.vectorizer_path, 'rb'))
+    export_bundle(model, vectorizer, args.bundle_path)
+    print(f"✓ Wrote {args.bundle_path} ({os.path.getsize(args.bundle_path) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+"""
+Pipeline Module - Streaming fetch -> analysis -> aggregation
+
+Tweets flow through in micro-batches: TwitterAPI yields pages, the analyzer
+scores each batch, and SentimentAggregator folds it into running counts and
+bounded top-k lists. Nothing keeps the full result set, so peak memory stays
+flat however many tweets a query returns.
+
+Batch CLI:
+    python pipeline.py --query "python lang:en" --max-results 5000
+    python pipeline.py --input tweets.jsonl > summary.json
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+from bucketing import GRANULARITIES, ConfidenceHistogram, hour_of_day_counts, local_times, sentiment_codes, time_bucket_counts
+from caching import LRUCache, make_key
+from data_visualizer import DataVisualizer
+from ranking import TopK, engagement_score
+
+SENTIMENTS = ('positive', 'neutral', 'negative')
+
+
+def iter_batches(pages, batch_size=100):
+    """
+    Re-chunk an iterable of pages (lists of tweets) into batches of batch_size
+    """
+    batch = []
+    for page in pages:
+        for tweet in page:
+            batch.append(tweet)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def iter_analyzed(pages, analyzer, batch_size=100):
+    """
+    Score pages of tweets in micro-batches
+    Yields: lists of analyzed tweet dicts
+    """
+    for batch in iter_batches(pages, batch_size):
+        yield analyzer.analyze_tweets(batch)
+
+
+class SentimentAggregator:
+    """
+    Incremental stats, categories and chart data over analyzed tweets
+
+    update() can be called with any number of batches; result() produces the
+    same stats/categorized/charts structure the routes return, holding only
+    counters and bounded samples in between. Each batch is read once: the
+    engagement score, sentiment and confidence of a tweet are taken out a
+    single time and every aggregate is updated from those.
+    """
+    CHARTS = ('pie_chart', 'bar_chart', 'timeline', 'engagement', 'hashtags', 'hourly', 'confidence')
+
+    # Timestamps and confidences are bucketed this many at a time; NumPy
+    # calls per small batch would cost more than they save
+    BUCKET_BATCH = 10000
+
+    def __init__(self, sample_size=50, category_size=50, top_n=10, granularity='day', timezone=None,
+                 confidence_edges=None):
+        self.sample_size = sample_size
+        self.top_n = top_n
+        self.granularity = granularity
+        self.timezone = timezone
+        self.total = 0
+        self.sentiment_counts = Counter()
+        self.confidence_sum = 0.0
+        self.sample = []
+        self.categories = {sentiment: TopK(category_size) for sentiment in SENTIMENTS}
+        self.engagement = TopK(top_n)
+        self.timeline = {}
+        self.hourly = {hour: dict.fromkeys(SENTIMENTS, 0) for hour in range(24)}
+        self.confidence = ConfidenceHistogram(
+            DataVisualizer.CONFIDENCE_BIN_EDGES if confidence_edges is None else confidence_edges
+        )
+        self._pending_times = []
+        self._pending_sentiments = []
+        self._pending_confidences = []
+        self.hashtags = Counter()
+
+    def update(self, analyzed_tweets):
+        """Fold a batch of analyzed tweets into the running aggregates"""
+        batch = list(analyzed_tweets)
+        if not batch:
+            return
+
+        sentiments = [tweet['sentiment'].lower() for tweet in batch]
+        scores = [engagement_score(tweet) for tweet in batch]
+        confidences = [tweet['confidence'] for tweet in batch]
+
+        self.total += len(batch)
+        self.sentiment_counts.update(sentiments)
+        self.confidence_sum += sum(confidences)
+
+        if len(self.sample) < self.sample_size:
+            self.sample.extend(batch[:self.sample_size - len(self.sample)])
+
+        by_sentiment = {sentiment: [] for sentiment in self.categories}
+        for score, tweet, sentiment in zip(scores, batch, sentiments):
+            bucket = by_sentiment.get(sentiment)
+            if bucket is not None:
+                bucket.append((score, tweet))
+        for sentiment, scored in by_sentiment.items():
+            if scored:
+                self.categories[sentiment].extend(scored)
+        self.engagement.extend(zip(scores, batch))
+
+        self._pending_times.extend(tweet.get('created_at') for tweet in batch)
+        self._pending_sentiments.extend(sentiments)
+        self._pending_confidences.extend(confidences)
+        if len(self._pending_times) >= self.BUCKET_BATCH:
+            self._bucket_pending()
+
+        self.hashtags.update(itertools.chain.from_iterable(
+            hashtags if isinstance(hashtags, list) else hashtags.split(', ')
+            for hashtags in (tweet.get('hashtags') for tweet in batch) if hashtags
+        ))
+
+    def _bucket_pending(self):
+        """Fold the buffered tweets into the timeline, hourly and confidence counts"""
+        if not self._pending_times:
+            return
+
+        times = local_times(self._pending_times, self.timezone)
+        codes = sentiment_codes(self._pending_sentiments)
+        self.confidence.add(self._pending_confidences, codes)
+        self._pending_times = []
+        self._pending_sentiments = []
+        self._pending_confidences = []
+
+        for label, counts in time_bucket_counts(times, codes, self.granularity).items():
+            bucket = self.timeline.get(label)
+            if bucket is None:
+                self.timeline[label] = counts
+            else:
+                for key, count in counts.items():
+                    bucket[key] += count
+        for hour, counts in hour_of_day_counts(times, codes).items():
+            for sentiment, count in counts.items():
+                self.hourly[hour][sentiment] += count
+
+    def stats(self):
+        """Same shape as SentimentAnalyzer.get_sentiment_stats"""
+        if not self.total:
+            return None
+
+        counts = self.sentiment_counts
+        return {
+            'total': self.total,
+            'positive': counts.get('positive', 0),
+            'neutral': counts.get('neutral', 0),
+            'negative': counts.get('negative', 0),
+            'positive_pct': round((counts.get('positive', 0) / self.total) * 100, 2),
+            'neutral_pct': round((counts.get('neutral', 0) / self.total) * 100, 2),
+            'negative_pct': round((counts.get('negative', 0) / self.total) * 100, 2),
+            'avg_confidence': round(self.confidence_sum / self.total, 4)
+        }
+
+    def categorized(self):
+        """Top tweets per sentiment by engagement (bounded by category_size)"""
+        return {sentiment: top.items() for sentiment, top in self.categories.items()}
+
+    def charts(self, names=CHARTS):
+        """
+        Chart payloads, by name (any of CHARTS); only the requested ones are built
+        Returns: None if nothing was aggregated
+        """
+        if not self.total:
+            return None
+
+        self._bucket_pending()
+        stats = self.stats()
+        has_dates = bool(self.timeline)
+        builders = {
+            'pie_chart': lambda: DataVisualizer.prepare_sentiment_pie_chart(stats),
+            'bar_chart': lambda: DataVisualizer.prepare_sentiment_bar_chart(stats),
+            'timeline': lambda: DataVisualizer.timeline_chart_from_counts(self.timeline) if has_dates else None,
+            'engagement': lambda: DataVisualizer.engagement_chart_from_tweets(self.engagement.items()),
+            'hashtags': lambda: DataVisualizer.hashtag_chart_from_counts(self.hashtags, self.top_n),
+            'hourly': lambda: DataVisualizer.hourly_chart_from_counts(self.hourly) if has_dates else None,
+            'confidence': lambda: DataVisualizer.confidence_chart_from_histogram(self.confidence)
+        }
+        return {name: builders[name]() for name in names}
+
+    def result(self):
+        return {
+            'stats': self.stats(),
+            'categorized': self.categorized(),
+            'tweets': self.sample,
+            'charts': self.charts()
+        }
+
+
+def compare_stats(stats1, stats2):
+    """
+    Side-by-side comparison of two get_sentiment_stats/SentimentAggregator.stats results
+    Returns: None if either side is empty
+    """
+    if not stats1 or not stats2:
+        return None
+
+    return {
+        'dataset1': stats1,
+        'dataset2': stats2,
+        'differences': {
+            'positive_diff': stats1['positive_pct'] - stats2['positive_pct'],
+            'neutral_diff': stats1['neutral_pct'] - stats2['neutral_pct'],
+            'negative_diff': stats1['negative_pct'] - stats2['negative_pct'],
+            'confidence_diff': stats1['avg_confidence'] - stats2['avg_confidence']
+        }
+    }
+
+
+def aggregate(analyzed_tweets, **options):
+    """
+    Single-pass SentimentAggregator over an already analyzed list
+    options: SentimentAggregator arguments
+    """
+    aggregator = SentimentAggregator(**options)
+    aggregator.update(analyzed_tweets)
+    return aggregator
+
+
+def analyze_stream(pages, analyzer, aggregator=None, batch_size=100):
+    """
+    Run pages of tweets through analysis into an aggregator
+    Returns: the aggregator
+    """
+    if aggregator is None:
+        aggregator = SentimentAggregator()
+    for analyzed in iter_analyzed(pages, analyzer, batch_size):
+        aggregator.update(analyzed)
+    return aggregator
+
+
+class TweetHistory:
+    """
+    Already-analyzed tweets per user timeline or search query
+
+    A repeat analysis asks lookup() for the stored entry, fetches only tweets
+    newer than its newest_id (since_id), scores just those, and merge() puts
+    them in front of the stored ones. The store is any cache backend, so a
+    SQLiteCache shares the history between workers. An entry expires ttl
+    seconds after it was first built, however often it is merged into, which
+    bounds how stale the engagement metrics of reused tweets can get. Requests
+    for more than max_tweets tweets bypass the history entirely.
+    """
+    def __init__(self, store=None, ttl=900, max_tweets=500):
+        self.store = store if store is not None else LRUCache(100)
+        self.ttl = ttl
+        self.max_tweets = max_tweets
+        self.fetched = 0
+        self.reused = 0
+
+    def covers(self, max_results):
+        """True if analyses of max_results tweets are kept in the history"""
+        return max_results <= self.max_tweets
+
+    def lookup(self, kind, key, max_results):
+        """
+        Returns: the stored entry ('newest_id', 'max_results', 'expires_at',
+                 'tweets' newest first), or None if there is no live entry
+                 covering max_results tweets
+        """
+        if not self.covers(max_results):
+            return None
+
+        entry = self.store.get(make_key('history', kind, key))
+        if entry is None or entry['max_results'] < max_results or entry.get('expires_at', 0) <= time.time():
+            return None
+        return entry
+
+    def merge(self, kind, key, max_results, new_tweets, entry=None, complete=True):
+        """
+        Put newly analyzed tweets (newest first) in front of the entry's and store the result
+        complete: False if the fetch of new_tweets stopped early; the result is
+                  returned but not stored, so the next lookup fetches from the
+                  entry's newest_id again instead of skipping the missed tweets
+        Returns: the merged tweets, at most max_results
+        """
+        new_tweets = list(new_tweets)
+
+        # A fetch that filled the request may have stopped short of the
+        # entry's newest tweet, so only a shorter one joins up with the entry
+        if entry and len(new_tweets) < max_results:
+            new_ids = {tweet['id'] for tweet in new_tweets}
+            merged = new_tweets + [tweet for tweet in entry['tweets'] if tweet['id'] not in new_ids]
+            limit = max(max_results, entry['max_results'])
+            expires_at = entry.get('expires_at', 0)
+        else:
+            merged = new_tweets
+            limit = max_results
+            expires_at = time.time() + self.ttl
+        merged = merged[:limit]
+
+        ttl = expires_at - time.time()
+        if complete and merged and self.covers(limit) and ttl > 0:
+            self.store.set(make_key('history', kind, key), {
+                'newest_id': max(tweet['id'] for tweet in merged),
+                'max_results': limit,
+                'expires_at': expires_at,
+                'tweets': merged
+            }, ttl)
+
+        merged = merged[:max_results]
+        self.fetched += len(new_tweets)
+        self.reused += len(merged) - min(len(new_tweets), len(merged))
+        return merged
+
+    def stats(self):
+        """Tweets fetched and scored vs reused from history, e.g. for /health"""
+        return {
+            'ttl': self.ttl,
+            'max_tweets': self.max_tweets,
+            'entries': len(self.store),
+            'fetched': self.fetched,
+            'reused': self.reused
+        }
+
+
+def read_jsonl_pages(path, page_size=100):
+    """
+    Pages of tweets from a JSON-lines file ('-' for stdin); created_at in ISO 8601
+    """
+    f = sys.stdin if path == '-' else open(path)
+    try:
+        tweets = (json.loads(line) for line in f if line.strip())
+        while True:
+            page = list(itertools.islice(tweets, page_size))
+            if not page:
+                return
+            for tweet in page:
+                if tweet.get('created_at'):
+                    tweet['created_at'] = datetime.fromisoformat(tweet['created_at'].replace('Z', '+00:00'))
+            yield page
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream tweets through sentiment analysis")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--query', help="Twitter recent-search query")
+    source.add_argument('--input', help="JSON-lines file of tweets ('-' for stdin)")
+    parser.add_argument('--max-results', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--granularity', choices=GRANULARITIES, default='day', help="Timeline bucket size")
+    parser.add_argument('--timezone', help="IANA timezone for the timeline and hourly charts (default UTC)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from sentiment_analyzer import SentimentAnalyzer
+    from twitter_api import TwitterAPI, prefetch
+
+    load_dotenv()
+    # Status messages go to stderr so stdout stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        analyzer = SentimentAnalyzer(
+            os.getenv('MODEL_PATH', 'trained_model.sav'),
+            os.getenv('VECTORIZER_PATH', 'vectorizer.pkl'),
+            engine=os.getenv('SENTIMENT_ENGINE', 'numpy'),
+            bundle_path=os.getenv('MODEL_BUNDLE_PATH', 'model_bundle.npz'),
+            mmap=True
+        )
+
+    if args.query:
+        bearer_token = os.getenv('BEARER_TOKEN')
+        if not bearer_token:
+            parser.error("BEARER_TOKEN is not set")
+        pages = prefetch(TwitterAPI(bearer_token).iter_search_tweets(args.query, args.max_results))
+    else:
+        pages = read_jsonl_pages(args.input)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        aggregator = SentimentAggregator(granularity=args.granularity, timezone=args.timezone)
+        analyze_stream(pages, analyzer, aggregator, batch_size=args.batch_size)
+    json.dump(aggregator.result(), sys.stdout, default=str, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
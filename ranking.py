@@ -0,0 +1,95 @@
+"""
+Ranking Module - Bounded top-k selection for tweets
+
+top_k() ranks dicts with a bounded heap, top_k_indices() ranks a NumPy
+score column with np.argpartition, and TopK keeps a running top-k across
+batches; all score every tweet once and order ties the way a stable sort
+with reverse=True does.
+"""
+
+import heapq
+import itertools
+
+import numpy as np
+
+
+def engagement_score(tweet):
+    """Engagement used to rank tweets everywhere: likes + retweets"""
+    return tweet.get('likes', 0) + tweet.get('retweets', 0)
+
+
+class TopK:
+    """
+    Keeps the k highest-scoring items seen so far in a bounded min-heap
+    Ties keep arrival order, matching a stable sort with reverse=True
+    """
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, score, item):
+        # -seq makes the earlier of two equal scores rank higher
+        entry = (score, -next(self._counter), item)
+        if self.k <= 0:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, scored_items):
+        """
+        Push many (score, item) pairs at once, in arrival order
+        Cheaper than push() per item for whole batches: one C-level selection
+        """
+        if self.k <= 0:
+            return
+        entries = [(score, -next(self._counter), item) for score, item in scored_items]
+        if len(self._heap) + len(entries) <= self.k:
+            self._heap.extend(entries)
+            heapq.heapify(self._heap)
+            return
+        # -seq is unique, so entries never fall through to comparing items
+        self._heap = heapq.nlargest(self.k, itertools.chain(self._heap, entries))
+        heapq.heapify(self._heap)
+
+    def items(self):
+        """Items from highest to lowest score"""
+        return [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+def top_k(items, k=None, key=engagement_score):
+    """
+    The k highest-ranked items, highest first
+    k: None ranks every item
+    key: score function, called once per item
+    """
+    if k is None:
+        return sorted(items, key=key, reverse=True)
+    # Bounded heap of k; same result and tie order as sorted(...)[:k]
+    return heapq.nlargest(k, items, key=key)
+
+
+def top_k_indices(scores, k=None):
+    """
+    Positions of the k largest scores, highest first
+    k: None ranks every position
+    Only the k candidates np.argpartition selects are sorted
+    """
+    scores = np.asarray(scores)
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    # Everything above the k-th largest score, then the earliest ties with it
+    threshold = scores[np.argpartition(scores, n - k)[n - k]]
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+    rows = np.sort(np.concatenate([above, ties]))
+    return rows[np.argsort(-scores[rows], kind='stable')]
@@ -0,0 +1,136 @@
+"""
+Rate Limit Module - Per-endpoint request budgets from Twitter's rate-limit headers
+
+Every v2 response carries x-rate-limit-limit / -remaining / -reset for its
+endpoint. RateLimitScheduler keeps the latest window per endpoint and admits
+calls against it, so an exhausted window fails fast with a retry-after
+instead of parking the calling worker until the window resets.
+"""
+
+import math
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Endpoint keys, in the API reference's notation
+USER_BY_USERNAME = '/users/by/username/:username'
+USER_TWEETS = '/users/:id/tweets'
+SEARCH_RECENT = '/tweets/search/recent'
+TWEET = '/tweets/:id'
+
+DEFAULT_RETRY_AFTER = 60
+
+_VERSION_PREFIX = re.compile(r'^/2(?=/)')
+_USERNAME_SEGMENT = re.compile(r'(/users/by/username/)[^/]+')
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+class RateLimitExceeded(Exception):
+    """A call was refused because its endpoint has no budget left this window"""
+    def __init__(self, endpoint, retry_after):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit reached for {endpoint}, retry in {math.ceil(retry_after)}s")
+
+
+class RateLimitScheduler:
+    """
+    Admits API calls against the remaining budget of each endpoint's window
+
+    priority 'high' calls (the first request a user action needs) may spend the
+    whole window; 'low' calls (follow-up pages of a long fetch) stop once only
+    `reserve` of it is left, so bulk pagination never starves new requests.
+    A call that finds no budget waits if the window resets within max_wait
+    seconds, otherwise acquire() raises RateLimitExceeded straight away.
+    """
+    def __init__(self, reserve=0.1, max_wait=1.0):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self._windows = {}
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+
+    @staticmethod
+    def endpoint_for(url):
+        """'https://api.twitter.com/2/users/123/tweets?...' -> '/users/:id/tweets'"""
+        path = _VERSION_PREFIX.sub('', urlsplit(url).path)
+        path = _USERNAME_SEGMENT.sub(r'\1:username', path)
+        return _ID_SEGMENT.sub('/:id', path)
+
+    def update(self, endpoint, limit, remaining, reset):
+        """
+        Record a window reported by the API
+        reset: epoch seconds at which the window refills
+        """
+        with self._lock:
+            window = self._windows.get(endpoint)
+            if window is not None and window['reset'] == reset:
+                # Same window: calls admitted since this response was sent are
+                # already counted locally, so never raise the budget back
+                remaining = min(remaining, window['remaining'])
+            self._windows[endpoint] = {'limit': limit, 'remaining': remaining, 'reset': reset}
+
+    def record_response(self, response, *args, **kwargs):
+        """requests response hook: update the window from the rate-limit headers"""
+        headers = response.headers
+        try:
+            limit = int(headers['x-rate-limit-limit'])
+            remaining = int(headers['x-rate-limit-remaining'])
+            reset = int(headers['x-rate-limit-reset'])
+        except (KeyError, ValueError):
+            return
+        if response.status_code == 429:
+            remaining = 0
+        self.update(self.endpoint_for(response.url), limit, remaining, reset)
+
+    def retry_after(self, endpoint):
+        """Seconds until the endpoint's window resets (DEFAULT_RETRY_AFTER if unknown)"""
+        with self._lock:
+            window = self._windows.get(endpoint)
+        if window is None:
+            return DEFAULT_RETRY_AFTER
+        return max(window['reset'] - time.time(), 0)
+
+    def acquire(self, endpoint, priority='high'):
+        """
+        Take one call from the endpoint's budget
+        Raises: RateLimitExceeded when none is left and the reset is too far away
+        """
+        while True:
+            with self._lock:
+                window = self._windows.get(endpoint)
+                now = time.time()
+                if window is None or window['reset'] <= now:
+                    # Unknown or refilled window: the next response reports it
+                    self._windows.pop(endpoint, None)
+                    self.admitted += 1
+                    return
+
+                floor = int(window['limit'] * self.reserve) if priority == 'low' else 0
+                if window['remaining'] > floor:
+                    window['remaining'] -= 1
+                    self.admitted += 1
+                    return
+
+                retry_after = window['reset'] - now
+                if retry_after > self.max_wait:
+                    self.rejected += 1
+                    raise RateLimitExceeded(endpoint, retry_after)
+
+            time.sleep(retry_after)
+
+    def stats(self):
+        """Current windows and admit/reject counters, e.g. for /health"""
+        now = time.time()
+        with self._lock:
+            windows = {
+                endpoint: {
+                    'limit': window['limit'],
+                    'remaining': window['remaining'],
+                    'resets_in': round(window['reset'] - now, 1)
+                }
+                for endpoint, window in self._windows.items() if window['reset'] > now
+            }
+        return {'admitted': self.admitted, 'rejected': self.rejected, 'endpoints': windows}
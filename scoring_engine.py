@@ -0,0 +1,205 @@
+"""
+Scoring Engine Module - Pure NumPy TF-IDF + linear model scoring
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+
+class DictVocabulary:
+    """
+    Term -> column lookup backed by the fitted vectorizer's vocabulary_ dict
+    """
+    def __init__(self, mapping):
+        self.mapping = mapping
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def lookup(self, tokens):
+        """
+        Returns: int64 array of columns, -1 for out-of-vocabulary tokens
+        """
+        get = self.mapping.get
+        return np.fromiter((get(token, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+
+
+class HashedVocabulary:
+    """
+    Term -> column lookup over a sorted array of 64-bit term hashes
+
+    Column i of the weight arrays belongs to term_hashes[i], so a vectorized
+    searchsorted replaces the Python dict without storing the terms themselves
+    """
+    def __init__(self, term_hashes):
+        self.term_hashes = term_hashes
+
+    def __len__(self):
+        return len(self.term_hashes)
+
+    def lookup(self, tokens):
+        """
+        Returns: int64 array of columns, -1 for out-of-vocabulary tokens
+        """
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        hashes = np.fromiter((term_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+        columns = np.searchsorted(self.term_hashes, hashes)
+        columns[columns == len(self.term_hashes)] = 0
+        return np.where(self.term_hashes[columns] == hashes, columns, -1)
+
+
+def term_hash(term):
+    """Stable 64-bit hash of a vocabulary term (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class LinearScoringEngine:
+    """
+    Re-implements TfidfVectorizer.transform + LogisticRegression.predict_proba
+    over plain NumPy arrays so the request path skips sklearn's validation layers
+    """
+    def __init__(self, vocabulary, idf, weights, intercept, classes,
+                 token_pattern=r"(?u)\b\w\w+\b", lowercase=True, norm='l2',
+                 sublinear_tf=False, multinomial=True):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        # Feature-major (n_features, n_outputs) so one row gather serves every output
+        self.weights = weights
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.token_re = re.compile(token_pattern)
+        self.lowercase = lowercase
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.multinomial = multinomial
+
+    @classmethod
+    def from_sklearn(cls, model, vectorizer):
+        """
+        Pull the fitted arrays out of a TfidfVectorizer and a linear classifier
+        Raises ValueError for vectorizer options this engine does not reproduce
+        """
+        params = vectorizer.get_params()
+        unsupported = {
+            'analyzer': 'word',
+            'ngram_range': (1, 1),
+            'tokenizer': None,
+            'preprocessor': None,
+            'stop_words': None,
+            'strip_accents': None,
+            'binary': False,
+        }
+        for name, expected in unsupported.items():
+            if params.get(name) != expected:
+                raise ValueError(f"Unsupported vectorizer option {name}={params.get(name)!r}")
+
+        if params.get('norm') not in ('l2', None):
+            raise ValueError(f"Unsupported vectorizer norm {params.get('norm')!r}")
+
+        if params.get('use_idf', True):
+            idf = vectorizer.idf_
+        else:
+            idf = np.ones(len(vectorizer.vocabulary_))
+
+        return cls(
+            vocabulary=DictVocabulary(vectorizer.vocabulary_),
+            idf=np.ascontiguousarray(idf, dtype=np.float64),
+            weights=np.ascontiguousarray(np.atleast_2d(model.coef_).T, dtype=np.float64),
+            intercept=model.intercept_,
+            classes=model.classes_,
+            token_pattern=params['token_pattern'],
+            lowercase=params['lowercase'],
+            norm=params['norm'],
+            sublinear_tf=params['sublinear_tf'],
+            multinomial=cls._is_multinomial(model)
+        )
+
+    @staticmethod
+    def _is_multinomial(model):
+        """
+        True if the model's predict_proba is a softmax over all classes, False
+        for one-vs-rest; mirrors LogisticRegression's resolution of multi_class
+        ('auto', or 'deprecated' in newer releases, is one-vs-rest with liblinear)
+        """
+        multi_class = getattr(model, 'multi_class', 'auto')
+        solver = getattr(model, 'solver', None)
+        if multi_class == 'ovr':
+            return False
+        if multi_class in ('auto', 'deprecated'):
+            return solver != 'liblinear'
+        if multi_class == 'multinomial':
+            return True
+        raise ValueError(f"Unsupported model multi_class={multi_class!r}")
+
+    def lookup(self, texts):
+        """
+        Tokenize texts and map tokens to feature columns
+        Returns: (rows, columns) arrays, one entry per in-vocabulary token
+        """
+        rows = []
+        tokens = []
+
+        for row, text in enumerate(texts):
+            if self.lowercase:
+                text = text.lower()
+            found = self.token_re.findall(text)
+            tokens.extend(found)
+            rows.extend([row] * len(found))
+
+        rows = np.array(rows, dtype=np.int64)
+        columns = self.vocabulary.lookup(tokens)
+        known = columns >= 0
+        return rows[known], columns[known]
+
+    def decision_function(self, texts):
+        """
+        Linear scores for each text
+        Returns: array of shape (n_texts, n_outputs)
+        """
+        n_texts = len(texts)
+        rows, columns = self.lookup(texts)
+        scores = np.zeros((n_texts, self.weights.shape[1]))
+
+        if len(rows):
+            # Collapse repeated (row, column) pairs into term counts
+            n_features = len(self.idf)
+            keys, counts = np.unique(rows * n_features + columns, return_counts=True)
+            rows = keys // n_features
+            columns = keys % n_features
+
+            tf = counts.astype(np.float64)
+            if self.sublinear_tf:
+                tf = np.log(tf) + 1
+            values = tf * self.idf[columns]
+
+            if self.norm == 'l2':
+                norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_texts))
+                values = values / norms[rows]
+
+            contributions = values[:, None] * self.weights[columns]
+            for output in range(scores.shape[1]):
+                scores[:, output] = np.bincount(
+                    rows, weights=contributions[:, output], minlength=n_texts
+                )
+
+        return scores + self.intercept
+
+    def predict_proba(self, texts):
+        """
+        Class probabilities for each text, matching LogisticRegression
+        Returns: array of shape (n_texts, n_classes)
+        """
+        scores = self.decision_function(texts)
+
+        if scores.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+
+        if self.multinomial:
+            scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        else:
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        return scores / scores.sum(axis=1, keepdims=True)
@@ -2,74 +2,333 @@
 Sentiment Analyzer Module - Handles all sentiment analysis operations
 """
 
+import hashlib
+import json
+import os
 import pickle
 import re
 from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from nltk.stem.porter import PorterStemmer
+except ImportError:
+    PorterStemmer = None
+
+from caching import LRUCache
+from columnar import AnalyzedTweets
+from model_bundle import bundle_is_current, export_bundle, load_bundle, process_memory
+from pipeline import aggregate, compare_stats
+from ranking import engagement_score, top_k
+from scoring_engine import LinearScoringEngine
+
+
+class TextNormalizer:
+    """
+    Compiled form of the original five re.sub passes of clean_text
+
+    URLs go first (as before, so a mention can never swallow the start of a
+    URL), then @mentions, '#' and other punctuation in one alternation, then
+    whitespace is collapsed with split/join. Output is identical to the
+    sequential version.
+    """
+    def __init__(self):
+        self._strip_urls = re.compile(r'http\S+|www\S+|https\S+').sub
+        self._strip_mentions_punctuation = re.compile(r'@\w+|[^\w\s]').sub
+    
+    def __call__(self, text):
+        text = self._strip_urls('', text)
+        text = self._strip_mentions_punctuation('', text)
+        return ' '.join(text.split()).lower()
+
+
+class StemmingPreprocessor:
+    """
+    Serving copy of the notebook's stemming(): the vectorizer was fitted on
+    letters-only, lowercased, Porter-stemmed text, so serve-time features must
+    go through the same steps to hit the vocabulary
+
+    The two paths are not identical: training stemmed the raw tweet, while
+    serving stems the output of TextNormalizer, which has already dropped
+    URLs, @mentions and apostrophes. Tokens such as 'http', 'co' or a
+    mentioned username are therefore never served, and "don't" becomes
+    'dont' rather than 'don t'. Tweets without those match exactly.
+
+    Stemming is the slow part, so stems are memoized per surface word in a
+    bounded LRU; tweet vocabulary is Zipfian and the hit rate is high.
+    """
+    def __init__(self, cache_size=100000):
+        self._non_letters = re.compile('[^a-zA-Z]').sub
+        self._stem = lru_cache(maxsize=cache_size)(PorterStemmer().stem)
+    
+    def __call__(self, text):
+        words = self._non_letters(' ', text).lower().split()
+        return ' '.join([self._stem(word) for word in words])
+    
+    def cache_info(self):
+        """functools.lru_cache statistics of the stem cache"""
+        return self._stem.cache_info()
+
+
+DEFAULT_LABELS = {
+    2: ['Negative', 'Positive'],
+    3: ['Negative', 'Neutral', 'Positive']
+}
+
+
+def load_label_metadata(labels_path):
+    """
+    Read the label metadata stored next to the model, e.g. trained_model.labels.json:
+        {"labels": {"0": "Negative", "1": "Positive"}, "neutral_threshold": 0.65}
+    Returns: dict (empty if the file is missing or unreadable)
+    """
+    if not os.path.exists(labels_path):
+        return {}
+    try:
+        with open(labels_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"✗ Error reading label metadata {labels_path}: {e}")
+        return {}
 
 
 class SentimentAnalyzer:
-    def __init__(self, model_path, vectorizer_path):
-        """Initialize sentiment analyzer with trained model"""
+    def __init__(self, model_path, vectorizer_path, engine='sklearn', bundle_path=None, mmap=False,
+                 stem=True, cache_size=10000, cache_ttl=None, labels_path=None,
+                 neutral_threshold=None):
+        """
+        Initialize sentiment analyzer with trained model
+        engine: 'sklearn' to score through the pickled estimators, or 'numpy'
+                to score with LinearScoringEngine over their extracted weights
+        bundle_path: compact model bundle used by the numpy engine; it is loaded
+                     instead of the pickles when current, and (re)exported otherwise
+        mmap: map the bundle read-only so gunicorn workers share its pages
+        stem: Porter-stem text before vectorizing, as the training notebook did
+        cache_size / cache_ttl: bound and lifetime (seconds, None = no expiry) of
+                                the prediction cache; cache_size=0 disables it
+        labels_path: label metadata JSON; defaults to <model_path minus extension>.labels.json
+        neutral_threshold: winning probabilities below this are reported as
+                           'Neutral'; defaults to the metadata value (None = off)
+        """
+        self.model = None
+        self.vectorizer = None
+        self.engine = None
+        self.has_proba = False
+        self.classes = None
+        self.label_names = None
+        self.source = None
+        self.normalizer = TextNormalizer()
+        self.preprocessor = None
+        self.cache = LRUCache(cache_size, cache_ttl) if cache_size else None
+        
+        if labels_path is None:
+            labels_path = os.path.splitext(model_path)[0] + '.labels.json'
+        self.label_metadata = load_label_metadata(labels_path)
+        if neutral_threshold is None:
+            neutral_threshold = self.label_metadata.get('neutral_threshold')
+        self.neutral_threshold = neutral_threshold
+        
+        if stem:
+            if PorterStemmer is not None:
+                self.preprocessor = StemmingPreprocessor()
+            else:
+                print("✗ nltk not installed, serving unstemmed text (accuracy will suffer)")
+        
+        if engine == 'numpy' and bundle_path and bundle_is_current(bundle_path, model_path, vectorizer_path):
+            try:
+                self.engine = load_bundle(bundle_path, mmap=mmap)
+                self._set_classes(self.engine.classes_)
+                self.source = 'bundle (mmap)' if mmap else 'bundle'
+                print(f"✓ Sentiment model bundle loaded from {bundle_path}")
+                return
+            except Exception as e:
+                print(f"✗ Error loading model bundle, falling back to pickles: {e}")
+        
         try:
             self.model = pickle.load(open(model_path, 'rb'))
             self.vectorizer = pickle.load(open(vectorizer_path, 'rb'))
+            # Resolved once here instead of probing with try/except per call
+            self.has_proba = hasattr(self.model, 'predict_proba')
+            self._set_classes(self.model.classes_)
+            self.source = 'pickle'
             print("✓ Sentiment model loaded successfully")
         except Exception as e:
             print(f"✗ Error loading sentiment model: {e}")
             self.model = None
             self.vectorizer = None
+            return
+        
+        if engine == 'numpy':
+            try:
+                self.engine = LinearScoringEngine.from_sklearn(self.model, self.vectorizer)
+                print("✓ NumPy scoring engine ready")
+            except (AttributeError, ValueError) as e:
+                print(f"✗ NumPy scoring engine unavailable, using sklearn: {e}")
+                return
+            
+            if bundle_path:
+                try:
+                    export_bundle(self.model, self.vectorizer, bundle_path)
+                    print(f"✓ Model bundle exported to {bundle_path}")
+                    # Serve from the bundle right away and drop the pickled objects
+                    self.engine = load_bundle(bundle_path, mmap=mmap)
+                    self.source = 'bundle (mmap)' if mmap else 'bundle'
+                    self.model = None
+                    self.vectorizer = None
+                except Exception as e:
+                    print(f"✗ Error exporting model bundle: {e}")
+    
+    def _set_classes(self, classes):
+        """
+        Map model.classes_ to display labels, in class order
+        Explicit names from the label metadata win; otherwise 2 and 3 classes
+        read as Negative/Positive and Negative/Neutral/Positive
+        """
+        names = self.label_metadata.get('labels', {})
+        defaults = DEFAULT_LABELS.get(len(classes))
+        
+        label_names = []
+        for i, value in enumerate(classes):
+            if str(value) in names:
+                label_names.append(names[str(value)])
+            elif defaults:
+                label_names.append(defaults[i])
+            else:
+                label_names.append(str(value).title())
+        
+        self.classes = np.asarray(classes)
+        self.label_names = np.array(label_names, dtype=object)
+    
+    def is_loaded(self):
+        """True if predictions can be served (pickled model or scoring engine)"""
+        return self.engine is not None or self.model is not None
+    
+    def cache_stats(self):
+        """Prediction cache counters, or None when caching is disabled"""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def memory_usage(self):
+        """
+        Where the model was loaded from and the current process memory
+        Compare pss_mb across workers to see what a shared mapped bundle saves
+        """
+        return {
+            'model_source': self.source,
+            'process': process_memory()
+        }
     
     def clean_text(self, text):
         """Clean text for analysis"""
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-        text = re.sub(r'@\w+', '', text)
-        text = re.sub(r'#', '', text)
-        text = re.sub(r'[^\w\s]', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text.lower()
+        return self.normalizer(text)
+    
+    def _infer(self, cleaned):
+        """
+        Run the model once over a batch of cleaned texts
+        Returns: (class indices, confidences) arrays
+        """
+        if self.preprocessor is not None:
+            cleaned = [self.preprocessor(text) for text in cleaned]
+        
+        if self.engine is not None:
+            proba = self.engine.predict_proba(cleaned)
+        elif self.has_proba:
+            # predict_proba evaluates the decision function once; the label is
+            # its argmax and the confidence is the winning probability
+            proba = self.model.predict_proba(self.vectorizer.transform(cleaned))
+        else:
+            predictions = self.model.predict(self.vectorizer.transform(cleaned))
+            return np.searchsorted(self.classes, predictions), np.ones(len(predictions))
+        
+        best = proba.argmax(axis=1)
+        return best, proba[np.arange(len(best)), best]
     
     def predict_sentiment(self, text):
         """
         Predict sentiment of text
         Returns: (sentiment, confidence)
         """
-        if not self.model or not self.vectorizer:
-            return "Unknown", 0.0
+        return self.predict_batch([text])[0]
+    
+    def predict_batch(self, texts):
+        """
+        Predict sentiment of many texts with a single vectorizer/model pass
+        Returns: list of (sentiment, confidence) in input order
+        """
+        return self.predict_cleaned([self.clean_text(text) for text in texts])
+    
+    def predict_cleaned(self, cleaned):
+        """
+        predict_batch for texts that already went through clean_text
+        Returns: list of (sentiment, confidence) in input order
+        """
+        if not cleaned:
+            return []
+        
+        if not self.is_loaded():
+            return [("Unknown", 0.0)] * len(cleaned)
         
+        if self.cache is None:
+            return self._predict_uncached(cleaned)
+        
+        # Retweets and copy-paste replies collapse to the same cleaned text, so
+        # only distinct cache misses are sent to the model
+        keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in cleaned]
+        results = [self.cache.get(key) for key in keys]
+        
+        pending = {}
+        for key, text, result in zip(keys, cleaned, results):
+            if result is None and key not in pending:
+                pending[key] = text
+        
+        if pending:
+            computed = dict(zip(pending, self._predict_uncached(list(pending.values()))))
+            for key, result in computed.items():
+                if result[0] != 'Error':
+                    self.cache.set(key, result)
+            results = [computed[key] if result is None else result for key, result in zip(keys, results)]
+        
+        return results
+    
+    def _predict_uncached(self, cleaned):
+        """Model pass for predict_cleaned, bypassing the cache"""
         try:
-            cleaned = self.clean_text(text)
-            vectorized = self.vectorizer.transform([cleaned])
-            prediction = self.model.predict(vectorized)[0]
+            best, confidences = self._infer(cleaned)
             
-            # Get confidence
-            try:
-                proba = self.model.predict_proba(vectorized)[0]
-                confidence = float(max(proba))
-            except:
-                confidence = 1.0
+            # Labels for the whole batch at once; low-confidence calls fall in
+            # the neutral band
+            sentiments = self.label_names[best]
+            if self.neutral_threshold is not None:
+                sentiments = np.where(confidences < self.neutral_threshold, 'Neutral', sentiments)
             
-            sentiment_map = {0: 'Negative', 1: 'Neutral', 2: 'Positive'}
-            return sentiment_map.get(prediction, 'Unknown'), confidence
+            return list(zip(sentiments.tolist(), confidences.tolist()))
             
         except Exception as e:
-            print(f"Prediction error: {e}")
-            return "Error", 0.0
+            print(f"Batch prediction error: {e}")
+            return [("Error", 0.0)] * len(cleaned)
     
-    def analyze_tweets(self, tweets):
+    def analyze_tweets(self, tweets, columnar=False):
         """
         Analyze multiple tweets
+        columnar: return an AnalyzedTweets (column-oriented) instead of dicts
         Returns: list of tweets with sentiment
         """
         analyzed = []
+        cleaned = [self.clean_text(tweet['text']) for tweet in tweets]
+        predictions = self.predict_cleaned(cleaned)
         
-        for tweet in tweets:
-            sentiment, confidence = self.predict_sentiment(tweet['text'])
-            
+        if columnar:
+            sentiments = [sentiment for sentiment, _ in predictions]
+            confidences = [confidence for _, confidence in predictions]
+            return AnalyzedTweets.from_records(tweets, sentiments, confidences, cleaned)
+        
+        for tweet, cleaned_text, (sentiment, confidence) in zip(tweets, cleaned, predictions):
             analyzed.append({
                 **tweet,
                 'sentiment': sentiment,
                 'confidence': confidence,
-                'cleaned_text': self.clean_text(tweet['text'])
+                'cleaned_text': cleaned_text
             })
         
         return analyzed
@@ -78,6 +337,9 @@ class SentimentAnalyzer:
         """
         Calculate sentiment statistics
         """
+        if isinstance(analyzed_tweets, AnalyzedTweets):
+            return analyzed_tweets.sentiment_stats()
+        
         if not analyzed_tweets:
             return None
         
@@ -95,10 +357,14 @@ class SentimentAnalyzer:
             'avg_confidence': round(sum([t['confidence'] for t in analyzed_tweets]) / total, 4)
         }
     
-    def categorize_tweets(self, analyzed_tweets):
+    def categorize_tweets(self, analyzed_tweets, limit=None):
         """
         Categorize tweets into positive, neutral, negative
+        limit: keep only the limit highest-engagement tweets of each category
         """
+        if isinstance(analyzed_tweets, AnalyzedTweets):
+            return analyzed_tweets.categorize(limit)
+        
         categorized = {
             'positive': [],
             'neutral': [],
@@ -110,12 +376,9 @@ class SentimentAnalyzer:
             if sentiment in categorized:
                 categorized[sentiment].append(tweet)
         
-        # Sort by engagement (likes + retweets)
+        # Rank by engagement (likes + retweets)
         for category in categorized:
-            categorized[category].sort(
-                key=lambda x: x.get('likes', 0) + x.get('retweets', 0),
-                reverse=True
-            )
+            categorized[category] = top_k(categorized[category], limit)
         
         return categorized
     
@@ -131,13 +394,13 @@ class SentimentAnalyzer:
             }
         
         analyzed = self.analyze_tweets(replies)
-        stats = self.get_sentiment_stats(analyzed)
-        categorized = self.categorize_tweets(analyzed)
+        # Stats and categories in one pass; every reply is kept in its category
+        aggregator = aggregate(analyzed, sample_size=0, category_size=len(analyzed), top_n=0)
         
         return {
             'total_replies': len(replies),
-            'sentiment_stats': stats,
-            'categorized_replies': categorized,
+            'sentiment_stats': aggregator.stats(),
+            'categorized_replies': aggregator.categorized(),
             'analyzed_replies': analyzed[:50]  # Top 50 replies
         }
     
@@ -145,53 +408,25 @@ class SentimentAnalyzer:
         """
         Compare sentiment between two datasets (users, posts, etc.)
         """
-        stats1 = self.get_sentiment_stats(data1)
-        stats2 = self.get_sentiment_stats(data2)
-        
-        if not stats1 or not stats2:
-            return None
-        
-        comparison = {
-            'dataset1': stats1,
-            'dataset2': stats2,
-            'differences': {
-                'positive_diff': stats1['positive_pct'] - stats2['positive_pct'],
-                'neutral_diff': stats1['neutral_pct'] - stats2['neutral_pct'],
-                'negative_diff': stats1['negative_pct'] - stats2['negative_pct'],
-                'confidence_diff': stats1['avg_confidence'] - stats2['avg_confidence']
-            }
-        }
-        
-        return comparison
+        return compare_stats(self.get_sentiment_stats(data1), self.get_sentiment_stats(data2))
     
     def get_top_tweets(self, analyzed_tweets, n=10, sort_by='engagement'):
         """
         Get top N tweets based on criteria
         sort_by: 'engagement', 'likes', 'retweets', 'confidence'
         """
+        if isinstance(analyzed_tweets, AnalyzedTweets):
+            return analyzed_tweets.top(n, sort_by)
+        
         if not analyzed_tweets:
             return []
         
         if sort_by == 'engagement':
-            sorted_tweets = sorted(
-                analyzed_tweets,
-                key=lambda x: x.get('likes', 0) + x.get('retweets', 0),
-                reverse=True
-            )
-        elif sort_by == 'confidence':
-            sorted_tweets = sorted(
-                analyzed_tweets,
-                key=lambda x: x.get('confidence', 0),
-                reverse=True
-            )
+            key = engagement_score
         else:
-            sorted_tweets = sorted(
-                analyzed_tweets,
-                key=lambda x: x.get(sort_by, 0),
-                reverse=True
-            )
+            key = lambda x: x.get(sort_by, 0)
         
-        return sorted_tweets[:n]
+        return top_k(analyzed_tweets, n, key)
     
     def generate_word_cloud_data(self, analyzed_tweets, sentiment_filter=None):
         """
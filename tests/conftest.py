@@ -0,0 +1,52 @@
+"""
+Shared fixtures: the shipped pickles and a fixed set of tweet texts
+"""
+
+import os
+import pickle
+import sys
+import warnings
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODEL_PATH = os.path.join(ROOT, 'trained_model.sav')
+VECTORIZER_PATH = os.path.join(ROOT, 'vectorizer.pkl')
+
+# Raw tweets as they come back from the API: URLs, mentions, hashtags,
+# emoji, punctuation runs, digits, unknown words and an empty one
+TEXTS = [
+    "I absolutely love this new phone, best purchase ever!!!",
+    "Worst customer service I've ever had. Never again.",
+    "@support my order still hasn't arrived https://t.co/abc123 #fail",
+    "Just landed in Paris \U0001F60D\U0001F1EB\U0001F1F7 www.example.com/trip",
+    "meh",
+    "The game was okay... not great, not terrible",
+    "RT @news: Markets rally as inflation cools #economy #stocks",
+    "so sad to hear about the loss, thinking of you all ❤️",
+    "running runs ran runner easily fairly",
+    "qwxzzy blorptastic frobnicated",
+    "10/10 would recommend, 5 stars",
+    "",
+]
+
+
+@pytest.fixture(scope='session')
+def sklearn_model():
+    """(model, vectorizer) unpickled from the shipped files"""
+    pytest.importorskip('sklearn')
+    with warnings.catch_warnings():
+        # The pickles were written by an older scikit-learn
+        warnings.simplefilter('ignore')
+        with open(MODEL_PATH, 'rb') as f:
+            model = pickle.load(f)
+        with open(VECTORIZER_PATH, 'rb') as f:
+            vectorizer = pickle.load(f)
+    return model, vectorizer
+
+
+@pytest.fixture
+def texts():
+    return list(TEXTS)
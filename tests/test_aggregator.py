@@ -0,0 +1,90 @@
+"""
+The fused SentimentAggregator pass must equal the per-feature helpers
+(get_sentiment_stats, categorize_tweets, DataVisualizer.prepare_*) at any
+batch size
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from data_visualizer import DataVisualizer
+from pipeline import SentimentAggregator
+from sentiment_analyzer import SentimentAnalyzer
+
+N = 250
+CATEGORY_SIZE = 5
+TOP_N = 10
+
+
+def make_tweets(n=N, seed=21):
+    rng = random.Random(seed)
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    tweets = []
+    for i in range(n):
+        tags = rng.sample(['python', 'ai', 'news', 'sports', 'music'], rng.randint(0, 3))
+        tweets.append({
+            'id': 10 ** 6 + i,
+            'text': f'tweet number {i} ' * 4,
+            # Some tweets without a timestamp; hours and days spread out
+            'created_at': None if i % 41 == 0 else start + timedelta(minutes=rng.randint(0, 60 * 24 * 6)),
+            # Small metric ranges so engagement ties are common
+            'likes': rng.randint(0, 20),
+            'retweets': rng.randint(0, 5),
+            'replies': rng.randint(0, 3),
+            # Hashtags as lists and as the comma-joined strings older data carries
+            'hashtags': tags if i % 2 else ', '.join(tags),
+            'sentiment': rng.choice(['Positive', 'Neutral', 'Negative']),
+            'confidence': rng.choice([0.2, 0.4, 0.6, 0.8, round(rng.random(), 4)])
+        })
+    return tweets
+
+
+@pytest.fixture(scope='module')
+def reference():
+    """Expected results from the non-fused helpers"""
+    tweets = make_tweets()
+    analyzer = object.__new__(SentimentAnalyzer)
+    stats = analyzer.get_sentiment_stats(tweets)
+    return tweets, {
+        'stats': stats,
+        'categorized': analyzer.categorize_tweets(tweets, CATEGORY_SIZE),
+        'charts': {
+            'pie_chart': DataVisualizer.prepare_sentiment_pie_chart(stats),
+            'bar_chart': DataVisualizer.prepare_sentiment_bar_chart(stats),
+            'timeline': DataVisualizer.prepare_timeline_chart(tweets),
+            'engagement': DataVisualizer.prepare_engagement_chart(tweets, TOP_N),
+            'hashtags': DataVisualizer.prepare_hashtag_chart(tweets, TOP_N),
+            'hourly': DataVisualizer.prepare_sentiment_by_hour(tweets),
+            'confidence': DataVisualizer.prepare_confidence_distribution(tweets)
+        }
+    }
+
+
+@pytest.mark.parametrize('bucket_batch', [SentimentAggregator.BUCKET_BATCH, 16])
+@pytest.mark.parametrize('batch_size', [N, 100, 7])
+def test_fused_pass_matches_helpers(reference, batch_size, bucket_batch, monkeypatch):
+    tweets, expected = reference
+    # A small BUCKET_BATCH flushes the buffered timestamps between batches
+    monkeypatch.setattr(SentimentAggregator, 'BUCKET_BATCH', bucket_batch)
+
+    aggregator = SentimentAggregator(category_size=CATEGORY_SIZE, top_n=TOP_N)
+    for start in range(0, len(tweets), batch_size):
+        aggregator.update(tweets[start:start + batch_size])
+    result = aggregator.result()
+
+    assert result['stats'] == expected['stats']
+    assert result['categorized'] == expected['categorized']
+    assert set(result['charts']) == set(SentimentAggregator.CHARTS)
+    for name in SentimentAggregator.CHARTS:
+        assert result['charts'][name] == expected['charts'][name], name
+    assert result['tweets'] == tweets[:aggregator.sample_size]
+
+
+def test_chart_subset_and_empty():
+    aggregator = SentimentAggregator()
+    assert aggregator.stats() is None and aggregator.charts() is None
+
+    aggregator.update(make_tweets(30))
+    assert set(aggregator.charts(('pie_chart', 'timeline'))) == {'pie_chart', 'timeline'}
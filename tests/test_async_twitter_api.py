@@ -0,0 +1,219 @@
+"""
+AsyncTwitterAPI against a local fake of the v2 endpoints it calls
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from async_twitter_api import AsyncTwitterAPI
+from rate_limit import USER_BY_USERNAME, RateLimitExceeded
+
+USERS = {
+    'alice': {'id': '11', 'username': 'alice', 'name': 'Alice'},
+    'bob': {'id': '22', 'username': 'bob', 'name': 'Bob'}
+}
+RESET = 4102444800  # 2100-01-01, far enough that retry_after stays positive
+
+
+def tweet(tweet_id, **extra):
+    return {
+        'id': str(tweet_id),
+        'text': f'tweet {tweet_id}',
+        'created_at': '2024-01-01T12:00:00.000Z',
+        'author_id': '11',
+        'public_metrics': {'like_count': tweet_id, 'retweet_count': 1, 'reply_count': 0, 'impression_count': 7},
+        **extra
+    }
+
+
+# Timelines newest first; alice's is longer than one 100-tweet page
+TIMELINES = {
+    '11': [tweet(11000 + i) for i in range(130, 0, -1)],
+    '22': [tweet(22000 + i) for i in range(12, 0, -1)]
+}
+REPLIES = [
+    tweet(501, referenced_tweets=[{'type': 'replied_to', 'id': '500'}]),
+    tweet(502, referenced_tweets=[{'type': 'quoted', 'id': '500'}]),
+    tweet(503, referenced_tweets=[{'type': 'replied_to', 'id': '500'}])
+]
+SEARCH = [tweet(900 + i, entities={'hashtags': [{'tag': 'python'}]}) for i in range(25, 0, -1)]
+
+
+def page(items, params, token_param):
+    """One page of items, following the fake's numeric next_token"""
+    start = int(params.get(token_param, 0))
+    size = int(params['max_results'])
+    assert size <= 100
+    body = {'data': items[start:start + size], 'meta': {'result_count': len(items[start:start + size])}}
+    if start + size < len(items):
+        body['meta']['next_token'] = str(start + size)
+    return body
+
+
+class FakeTwitter(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.requests.append((url.path, params))
+        parts = url.path.strip('/').split('/')
+
+        if parts[:3] == ['users', 'by', 'username']:
+            if parts[3] == 'limited':
+                return self.send_json({'title': 'Too Many Requests'}, 429, {
+                    'x-rate-limit-limit': '300', 'x-rate-limit-remaining': '0', 'x-rate-limit-reset': str(RESET)
+                })
+            user = USERS.get(parts[3])
+            if user is None:
+                return self.send_json({'errors': [{'title': 'Not Found Error'}]})
+            return self.send_json({'data': {
+                **user, 'created_at': '2020-01-01T00:00:00.000Z', 'description': '', 'verified': False,
+                'public_metrics': {'followers_count': 10, 'following_count': 5, 'tweet_count': 12, 'listed_count': 0}
+            }})
+        if parts[0] == 'users' and parts[2:] == ['tweets']:
+            return self.send_json(page(TIMELINES.get(parts[1], []), params, 'pagination_token'))
+        if parts == ['tweets', 'search', 'recent']:
+            items = REPLIES if params['query'].startswith('conversation_id:') else SEARCH
+            return self.send_json(page(items, params, 'next_token'))
+        if parts[0] == 'tweets' and len(parts) == 2:
+            if parts[1] == '404':
+                return self.send_json({'errors': [{'title': 'Not Found Error'}]})
+            return self.send_json({'data': tweet(int(parts[1]))})
+        self.send_json({'title': 'Not Found'}, 404)
+
+    def send_json(self, body, status=200, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeTwitter)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+@pytest.fixture
+def run(server):
+    """Run a coroutine function against a fresh client; returns (result, requests made)"""
+    def run(call):
+        FakeTwitter.requests = []
+
+        async def main():
+            async with AsyncTwitterAPI('token', base_url=server) as api:
+                return await call(api)
+
+        return asyncio.run(main()), FakeTwitter.requests
+    return run
+
+
+def test_get_user_info(run):
+    user, requests = run(lambda api: api.get_user_info('@alice'))
+    assert user['id'] == 11 and user['username'] == 'alice'
+    assert user['followers_count'] == 10 and user['created_at'].year == 2020
+    assert requests[0][0] == '/users/by/username/alice'
+
+
+def test_get_user_info_caches_and_handles_missing(run):
+    async def twice(api):
+        first = await api.get_user_info('alice')
+        return first, await api.get_user_info('ALICE'), await api.get_user_info('nobody')
+
+    (first, second, missing), requests = run(twice)
+    assert second is first
+    assert missing is None
+    assert [path for path, _ in requests] == ['/users/by/username/alice', '/users/by/username/nobody']
+
+
+@pytest.mark.parametrize('username', ['../tweets/1', 'a/b', 'alice?x=1', 'x' * 16, ''])
+def test_get_user_info_rejects_invalid_usernames(run, username):
+    user, requests = run(lambda api: api.get_user_info(username))
+    assert user is None
+    assert requests == []
+
+
+def test_get_user_tweets_resolves_username(run):
+    tweets, requests = run(lambda api: api.get_user_tweets('bob', 5))
+    assert [t['id'] for t in tweets] == [22012, 22011, 22010, 22009, 22008]
+    assert tweets[0]['impressions'] == 7 and tweets[0]['likes'] == 22012
+    assert [path for path, _ in requests] == ['/users/by/username/bob', '/users/22/tweets']
+
+
+def test_get_user_tweets_with_user_id_skips_lookup(run):
+    tweets, requests = run(lambda api: api.get_user_tweets('bob', 5, user_id=22))
+    assert len(tweets) == 5
+    assert [path for path, _ in requests] == ['/users/22/tweets']
+
+
+def test_pagination_follows_next_token(run):
+    tweets, requests = run(lambda api: api.get_user_tweets('alice', 120, user_id=11))
+    assert [t['id'] for t in tweets] == list(range(11130, 11010, -1))
+    # The second page asks only for what is still missing
+    assert [(params['max_results'], params.get('pagination_token')) for _, params in requests] == [
+        ('100', None), ('20', '100')
+    ]
+
+    tweets, requests = run(lambda api: api.get_user_tweets('alice', 500, user_id=11))
+    assert len(tweets) == 130
+    assert [params.get('pagination_token') for _, params in requests] == [None, '100']
+
+
+def test_get_tweet_replies_keeps_only_replies(run):
+    replies, requests = run(lambda api: api.get_tweet_replies(500, 10))
+    assert [reply['id'] for reply in replies] == [501, 503]
+    assert replies[0]['author_id'] == 11
+    assert requests[0][1]['query'] == 'conversation_id:500'
+
+
+def test_search_tweets(run):
+    results, requests = run(lambda api: api.search_tweets('python lang:en', 30))
+    assert len(results) == 25
+    assert results[0]['hashtags'] == ['python'] and results[0]['author_id'] == 11
+    assert requests[0][1]['query'] == 'python lang:en' and 'start_time' in requests[0][1]
+
+
+def test_get_single_tweet(run):
+    found, _ = run(lambda api: api.get_single_tweet(700))
+    assert found['id'] == 700 and found['author_id'] == 11
+    missing, _ = run(lambda api: api.get_single_tweet(404))
+    assert missing is None
+
+
+def test_compare_users(run):
+    comparison, requests = run(lambda api: api.compare_users('alice', 'bob', 3))
+    assert comparison['user1']['info']['id'] == 11 and comparison['user2']['info']['id'] == 22
+    assert [t['id'] for t in comparison['user2']['tweets']] == [22012, 22011, 22010]
+    # One profile lookup per user
+    assert sorted(path for path, _ in requests if 'username' in path) == [
+        '/users/by/username/alice', '/users/by/username/bob'
+    ]
+    missing, _ = run(lambda api: api.compare_users('alice', 'nobody', 3))
+    assert missing is None
+
+
+def test_rate_limit_raises(run):
+    with pytest.raises(RateLimitExceeded) as error:
+        run(lambda api: api.get_user_info('limited'))
+    assert error.value.endpoint == USER_BY_USERNAME
+    assert error.value.retry_after > 0
+
+    with pytest.raises(RateLimitExceeded):
+        run(lambda api: api.compare_users('alice', 'limited', 3))
@@ -0,0 +1,76 @@
+"""
+Cache backends: ttl=None never expires, ttl <= 0 never stores
+"""
+
+import time
+
+import pytest
+
+from caching import LRUCache, SQLiteCache
+
+
+@pytest.fixture(params=['lru', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make_cache(ttl=None):
+        if request.param == 'lru':
+            return LRUCache(10, ttl)
+        return SQLiteCache(str(tmp_path / 'cache.db'), ttl)
+    return make_cache
+
+
+def test_round_trip(make_cache):
+    cache = make_cache()
+    cache.set('k', {'id': 1, 'tags': ['a']})
+    assert cache.get('k') == {'id': 1, 'tags': ['a']}
+    assert cache.get('missing', 'default') == 'default'
+
+
+@pytest.mark.parametrize('ttl', [0, 0.0, -1])
+def test_non_positive_ttl_stores_nothing(make_cache, ttl):
+    cache = make_cache()
+    cache.set('k', 'old')
+    cache.set('k', 'new', ttl=ttl)
+    assert cache.get('k') is None
+    assert len(cache) == 0
+
+
+def test_zero_default_ttl_stores_nothing(make_cache):
+    cache = make_cache(ttl=0)
+    cache.set('k', 'v')
+    assert cache.get('k') is None
+
+
+def test_none_ttl_never_expires(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.set('k', 'v', ttl=None)
+    later = time.time() + 10 ** 6, time.monotonic() + 10 ** 6
+    monkeypatch.setattr(time, 'time', lambda: later[0])
+    monkeypatch.setattr(time, 'monotonic', lambda: later[1])
+    assert cache.get('k') == 'v'
+
+
+def test_positive_ttl_expires(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.set('k', 'v', ttl=5)
+    assert cache.get('k') == 'v'
+    later = time.time() + 6, time.monotonic() + 6
+    monkeypatch.setattr(time, 'time', lambda: later[0])
+    monkeypatch.setattr(time, 'monotonic', lambda: later[1])
+    assert cache.get('k') is None
+
+
+def test_twitter_api_skips_cache_for_zero_ttl(monkeypatch):
+    pytest.importorskip('tweepy')
+    from twitter_api import TwitterAPI
+
+    api = TwitterAPI('token', cache_ttls={'tweet': 0})
+    calls = []
+    fetch = lambda tweet_id: calls.append(tweet_id) or {'id': tweet_id}
+    assert api._cached('tweet', ('1',), fetch, 1) == {'id': 1}
+    assert api._cached('tweet', ('1',), fetch, 1) == {'id': 1}
+    assert calls == [1, 1]
+    assert len(api.cache) == 0
+
+    api._cached('user', ('alice',), fetch, 2)
+    api._cached('user', ('alice',), fetch, 2)
+    assert calls == [1, 1, 2]
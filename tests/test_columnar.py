@@ -0,0 +1,45 @@
+"""
+AnalyzedTweets (float32 confidence) bins confidences exactly like the dict path
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip('pandas')
+
+from columnar import AnalyzedTweets
+from data_visualizer import DataVisualizer
+
+SENTIMENT_LABELS = ['Positive', 'Neutral', 'Negative']
+
+
+def analyzed(confidences):
+    return [
+        {'id': i, 'text': f'tweet {i}', 'likes': i, 'retweets': 0,
+         'sentiment': SENTIMENT_LABELS[i % 3], 'confidence': confidence}
+        for i, confidence in enumerate(confidences)
+    ]
+
+
+@pytest.mark.parametrize('edges', [None, [33, 66.5], [10, 50, 90, 99]])
+def test_confidence_bins_match_dict_path(edges):
+    bounds = [edge / 100 for edge in (edges or DataVisualizer.CONFIDENCE_BIN_EDGES)]
+    rng = random.Random(22)
+    # Exactly on every edge, next to it, and model-like values
+    confidences = [0.0, 1.0, *bounds]
+    confidences += [bound + step for bound in bounds for step in (-1e-6, 1e-6)]
+    confidences += [round(rng.random(), rng.choice([2, 3, 6])) for _ in range(2000)]
+    tweets = analyzed(confidences)
+
+    for by_sentiment in (False, True):
+        expected = DataVisualizer.prepare_confidence_distribution(tweets, edges, by_sentiment)
+        actual = DataVisualizer.prepare_confidence_distribution(AnalyzedTweets.from_records(tweets), edges, by_sentiment)
+        assert actual == expected
+
+
+def test_edge_belongs_to_the_bin_below():
+    chart = DataVisualizer.prepare_confidence_distribution(
+        AnalyzedTweets.from_records(analyzed([0.2, 0.4, 0.6, 0.8]))
+    )
+    assert chart['data'] == [1, 1, 1, 1, 0]
@@ -0,0 +1,86 @@
+"""
+Sentiment labels come from model.classes_ (class 1 is Positive) and the
+neutral band relabels low-confidence predictions
+"""
+
+import contextlib
+import io
+import json
+import warnings
+
+import numpy as np
+import pytest
+
+from conftest import MODEL_PATH, ROOT, VECTORIZER_PATH
+from sentiment_analyzer import SentimentAnalyzer
+
+pytest.importorskip('sklearn')
+
+LABELS_PATH = f'{ROOT}/trained_model.labels.json'
+POSITIVE = "I love this, best day ever, so happy and grateful"
+NEGATIVE = "I hate this, worst day ever, so sad and angry"
+
+
+def make_analyzer(engine='sklearn', **options):
+    options.setdefault('cache_size', 0)
+    with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter('ignore')
+        return SentimentAnalyzer(MODEL_PATH, VECTORIZER_PATH, engine=engine, **options)
+
+
+@pytest.fixture(scope='module')
+def no_metadata(tmp_path_factory):
+    """Path of a labels file that does not exist"""
+    return str(tmp_path_factory.mktemp('labels') / 'missing.labels.json')
+
+
+def test_labels_from_classes_alone(no_metadata):
+    analyzer = make_analyzer(labels_path=no_metadata)
+    assert analyzer.label_metadata == {}
+    assert dict(zip(analyzer.classes.tolist(), analyzer.label_names)) == {0: 'Negative', 1: 'Positive'}
+    assert analyzer.neutral_threshold is None
+    assert analyzer.predict_sentiment(POSITIVE)[0] == 'Positive'
+    assert analyzer.predict_sentiment(NEGATIVE)[0] == 'Negative'
+
+
+def test_labels_from_metadata_file():
+    analyzer = make_analyzer(labels_path=LABELS_PATH)
+    assert dict(zip(analyzer.classes.tolist(), analyzer.label_names)) == {0: 'Negative', 1: 'Positive'}
+    assert analyzer.neutral_threshold == 0.65
+    assert analyzer.predict_sentiment(POSITIVE)[0] == 'Positive'
+
+
+def test_metadata_names_win(tmp_path):
+    labels_path = tmp_path / 'model.labels.json'
+    labels_path.write_text(json.dumps({'labels': {'0': 'Bad', '1': 'Good'}}))
+    analyzer = make_analyzer(labels_path=str(labels_path))
+    assert analyzer.label_names.tolist() == ['Bad', 'Good']
+    assert analyzer.predict_sentiment(POSITIVE)[0] == 'Good'
+
+
+def test_neutral_band(no_metadata, texts):
+    unbanded = make_analyzer(labels_path=no_metadata, neutral_threshold=None).predict_batch(texts)
+    assert 'Neutral' not in {sentiment for sentiment, _ in unbanded}
+
+    threshold = float(np.median([confidence for _, confidence in unbanded]))
+    banded = make_analyzer(labels_path=no_metadata, neutral_threshold=threshold).predict_batch(texts)
+    for (sentiment, confidence), (banded_sentiment, banded_confidence) in zip(unbanded, banded):
+        assert banded_confidence == confidence
+        assert banded_sentiment == ('Neutral' if confidence < threshold else sentiment)
+
+
+def test_null_threshold_in_metadata_turns_band_off(tmp_path, texts):
+    labels_path = tmp_path / 'model.labels.json'
+    labels_path.write_text(json.dumps({'labels': {'0': 'Negative', '1': 'Positive'}, 'neutral_threshold': None}))
+    analyzer = make_analyzer(labels_path=str(labels_path))
+    assert analyzer.neutral_threshold is None
+    assert 'Neutral' not in {sentiment for sentiment, _ in analyzer.predict_batch(texts)}
+
+
+@pytest.mark.parametrize('threshold', [None, 0.65])
+def test_numpy_engine_matches_sklearn(threshold, no_metadata, texts):
+    sklearn_results = make_analyzer('sklearn', labels_path=no_metadata, neutral_threshold=threshold).predict_batch(texts)
+    numpy_results = make_analyzer('numpy', labels_path=no_metadata, neutral_threshold=threshold).predict_batch(texts)
+    assert [sentiment for sentiment, _ in numpy_results] == [sentiment for sentiment, _ in sklearn_results]
+    np.testing.assert_allclose([confidence for _, confidence in numpy_results],
+                               [confidence for _, confidence in sklearn_results], rtol=0, atol=1e-12)
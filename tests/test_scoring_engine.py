@@ -0,0 +1,106 @@
+"""
+LinearScoringEngine must score exactly like the sklearn estimators it replaces
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from model_bundle import export_bundle, load_bundle
+from scoring_engine import LinearScoringEngine
+from sentiment_analyzer import StemmingPreprocessor, TextNormalizer
+
+
+def serving_texts(texts):
+    """Texts as the analyzer hands them to the model: normalized and stemmed"""
+    normalize = TextNormalizer()
+    stem = StemmingPreprocessor()
+    return [stem(normalize(text)) for text in texts]
+
+
+def expected_proba(sklearn_model, texts):
+    model, vectorizer = sklearn_model
+    return model.predict_proba(vectorizer.transform(texts))
+
+
+def test_from_sklearn_matches_predict_proba(sklearn_model, texts):
+    engine = LinearScoringEngine.from_sklearn(*sklearn_model)
+    for batch in (texts, serving_texts(texts)):
+        np.testing.assert_allclose(engine.predict_proba(batch), expected_proba(sklearn_model, batch),
+                                   rtol=0, atol=1e-12)
+
+
+def test_from_sklearn_keeps_class_order(sklearn_model):
+    model, vectorizer = sklearn_model
+    engine = LinearScoringEngine.from_sklearn(model, vectorizer)
+    np.testing.assert_array_equal(engine.classes_, model.classes_)
+
+
+def test_mapped_bundle_matches_predict_proba(sklearn_model, texts, tmp_path):
+    bundle_path = str(tmp_path / 'model_bundle.npz')
+    export_bundle(*sklearn_model, bundle_path)
+    engine = load_bundle(bundle_path, mmap=True)
+
+    assert isinstance(engine.weights, np.memmap)
+    np.testing.assert_array_equal(engine.classes_, sklearn_model[0].classes_)
+    for batch in (texts, serving_texts(texts)):
+        # The bundle stores idf and weights as float32
+        np.testing.assert_allclose(engine.predict_proba(batch), expected_proba(sklearn_model, batch),
+                                   rtol=0, atol=1e-5)
+
+
+def test_empty_batch(sklearn_model):
+    engine = LinearScoringEngine.from_sklearn(*sklearn_model)
+    assert engine.predict_proba([]).shape == (0, 2)
+
+
+
+CORPUS = ['good great happy', 'bad awful sad', 'okay fine average', 'great good fine',
+          'sad bad okay', 'happy great average', 'awful sad fine', 'fine okay good']
+LABELS = [2, 0, 1, 2, 0, 2, 0, 1]
+
+
+@pytest.mark.parametrize('model, multinomial', [
+    (SimpleNamespace(multi_class='auto', solver='liblinear'), False),
+    (SimpleNamespace(multi_class='deprecated', solver='liblinear'), False),
+    (SimpleNamespace(multi_class='ovr', solver='lbfgs'), False),
+    (SimpleNamespace(multi_class='auto', solver='lbfgs'), True),
+    (SimpleNamespace(multi_class='multinomial', solver='saga'), True),
+    (SimpleNamespace(solver='lbfgs'), True),
+])
+def test_multi_class_resolution(model, multinomial):
+    assert LinearScoringEngine._is_multinomial(model) is multinomial
+
+
+def test_multinomial_probabilities_match():
+    TfidfVectorizer = pytest.importorskip('sklearn.feature_extraction.text').TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    vectorizer = TfidfVectorizer().fit(CORPUS)
+    model = LogisticRegression().fit(vectorizer.transform(CORPUS), LABELS)
+    engine = LinearScoringEngine.from_sklearn(model, vectorizer)
+
+    texts = CORPUS + ['good sad', 'unknown words only']
+    np.testing.assert_allclose(engine.predict_proba(texts), model.predict_proba(vectorizer.transform(texts)),
+                               rtol=0, atol=1e-12)
+
+
+def test_one_vs_rest_probabilities_match():
+    TfidfVectorizer = pytest.importorskip('sklearn.feature_extraction.text').TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.multiclass import OneVsRestClassifier
+
+    vectorizer = TfidfVectorizer().fit(CORPUS)
+    ovr = OneVsRestClassifier(LogisticRegression()).fit(vectorizer.transform(CORPUS), LABELS)
+    # What a multiclass liblinear LogisticRegression holds: one binary model per class
+    model = SimpleNamespace(
+        coef_=np.vstack([estimator.coef_ for estimator in ovr.estimators_]),
+        intercept_=np.concatenate([estimator.intercept_ for estimator in ovr.estimators_]),
+        classes_=ovr.classes_, multi_class='auto', solver='liblinear'
+    )
+    engine = LinearScoringEngine.from_sklearn(model, vectorizer)
+
+    texts = CORPUS + ['good sad', 'unknown words only']
+    np.testing.assert_allclose(engine.predict_proba(texts), ovr.predict_proba(vectorizer.transform(texts)),
+                               rtol=0, atol=1e-12)
@@ -0,0 +1,66 @@
+"""
+Serve-side stemming must reproduce the notebook's stemming() features
+"""
+
+import re
+
+import numpy as np
+import pytest
+
+pytest.importorskip('nltk')
+from nltk.stem.porter import PorterStemmer
+
+from sentiment_analyzer import StemmingPreprocessor, TextNormalizer
+
+port_stem = PorterStemmer()
+
+
+def stemming(text):
+    """stemming() from suvamcopy.ipynb, the version stemmed_content was built with"""
+    if not isinstance(text, str):
+        text = ""
+    text = re.sub('[^a-zA-Z]', ' ', text)
+    words = text.lower().split()
+    stemmed_words = [port_stem.stem(word) for word in words]
+    return ' '.join(stemmed_words)
+
+
+def test_matches_notebook_stemming(texts):
+    preprocess = StemmingPreprocessor()
+    for text in texts:
+        assert preprocess(text) == stemming(text)
+
+
+def test_matches_notebook_features(sklearn_model, texts):
+    _, vectorizer = sklearn_model
+    preprocess = StemmingPreprocessor()
+    served = vectorizer.transform([preprocess(text) for text in texts])
+    trained = vectorizer.transform([stemming(text) for text in texts])
+    assert (served != trained).nnz == 0
+
+
+def test_stem_cache_reuses_words():
+    preprocess = StemmingPreprocessor(cache_size=10)
+    preprocess("running runs running")
+    info = preprocess.cache_info()
+    assert info.hits == 1 and info.misses == 2
+
+
+def test_serving_stems_normalized_text(sklearn_model):
+    """
+    Serving stems after TextNormalizer has dropped URLs and mentions; training
+    stemmed the raw text, so only tweets without them get identical features
+    """
+    _, vectorizer = sklearn_model
+    normalize = TextNormalizer()
+    preprocess = StemmingPreprocessor()
+
+    plain = "Loving the new release, so good!"
+    assert preprocess(normalize(plain)) == stemming(plain)
+
+    tweet = "@support my order still hasn't arrived https://t.co/abc123"
+    served = preprocess(normalize(tweet))
+    assert served != stemming(tweet)
+    assert 'support' not in served.split() and 'http' not in served.split()
+    assert not np.array_equal(vectorizer.transform([served]).toarray(),
+                              vectorizer.transform([stemming(tweet)]).toarray())
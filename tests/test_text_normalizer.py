@@ -0,0 +1,50 @@
+"""
+TextNormalizer must produce exactly what the original clean_text did
+"""
+
+import random
+import re
+
+import pytest
+
+from sentiment_analyzer import TextNormalizer
+
+
+def legacy_clean_text(text):
+    """The original five-pass clean_text"""
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'@\w+', '', text)
+    text = re.sub(r'#', '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.lower()
+
+
+# Pieces that interact at the boundaries the two-pass version merged
+PIECES = [
+    'http://t.co/abc', 'https://x.com/a?b=c', 'www.example.org', 'httpfoo', 'wwwbar',
+    '@user', '@user_1', '@', '@@x', '#tag', '#', '##', 'e-mail', "don't", '...', '!!!',
+    'Café', 'naïve', 'ÜBER', '日本語', '\U0001F600', '❤️', '_under_', '42',
+    ' ', '  ', '\t', '\n', '\r\n', ' ', ' ', '\x0b', '\x1c', '',
+]
+
+
+@pytest.mark.parametrize('text', [
+    "@support my order still hasn't arrived https://t.co/abc123 #fail",
+    "RT @news: Markets rally!!! #economy www.example.com/markets",
+    "email@example.com and @handle@other",
+    "@https://t.co/x mention glued to a URL",
+    "   leading and trailing   \n\t whitespace   ",
+    "MiXeD CaSe #HashTag",
+    "",
+])
+def test_matches_legacy_clean_text(text):
+    assert TextNormalizer()(text) == legacy_clean_text(text)
+
+
+def test_matches_legacy_clean_text_on_random_tweets():
+    rng = random.Random(2057)
+    normalize = TextNormalizer()
+    for _ in range(20000):
+        text = ''.join(rng.choice(PIECES) + rng.choice(['', ' ', '/']) for _ in range(rng.randint(0, 12)))
+        assert normalize(text) == legacy_clean_text(text), text
@@ -0,0 +1,85 @@
+"""
+TweetHistory merges delta fetches without outliving its ttl or losing tweets
+"""
+
+import time
+
+from caching import LRUCache, SQLiteCache
+from pipeline import TweetHistory
+
+
+def tweets(*ids, likes=0):
+    """Analyzed tweet dicts, newest (highest id) first"""
+    return [{'id': i, 'text': f'tweet {i}', 'likes': likes, 'sentiment': 'Positive', 'confidence': 0.9}
+            for i in sorted(ids, reverse=True)]
+
+
+def test_merge_puts_new_tweets_first():
+    history = TweetHistory(LRUCache(10), ttl=60)
+    history.merge('search', 'q', 5, tweets(1, 2, 3))
+    entry = history.lookup('search', 'q', 5)
+    assert entry['newest_id'] == 3
+
+    merged = history.merge('search', 'q', 5, tweets(4, 5), entry)
+    assert [tweet['id'] for tweet in merged] == [5, 4, 3, 2, 1]
+    assert history.stats()['reused'] == 3
+
+
+def test_entry_expires_ttl_after_creation_despite_merges(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    store = SQLiteCache(':memory:')
+    history = TweetHistory(store, ttl=3)
+
+    history.merge('user', 1, 5, tweets(1, 2))
+    for step in range(5):
+        now[0] += 1.2
+        entry = history.lookup('user', 1, 5)
+        if entry is None:
+            break
+        history.merge('user', 1, 5, tweets(10 + step), entry)
+
+    # Created at 1000, so gone by 1003 however often it was merged into
+    assert now[0] < 1004
+    assert history.lookup('user', 1, 5) is None
+
+
+def test_partial_fetch_is_not_stored():
+    history = TweetHistory(LRUCache(10), ttl=60)
+    history.merge('search', 'q', 5, tweets(1, 2))
+    entry = history.lookup('search', 'q', 5)
+
+    merged = history.merge('search', 'q', 5, tweets(8, 9), entry, complete=False)
+    assert [tweet['id'] for tweet in merged] == [9, 8, 2, 1]
+    # The next lookup fetches from the old newest_id again, covering the gap
+    assert history.lookup('search', 'q', 5)['newest_id'] == 2
+
+
+def test_smaller_request_keeps_the_larger_list():
+    history = TweetHistory(LRUCache(10), ttl=60)
+    history.merge('search', 'q', 10, tweets(*range(1, 11)))
+
+    merged = history.merge('search', 'q', 5, tweets(11), history.lookup('search', 'q', 5))
+    assert [tweet['id'] for tweet in merged] == [11, 10, 9, 8, 7]
+
+    entry = history.lookup('search', 'q', 10)
+    assert entry['max_results'] == 10
+    assert [tweet['id'] for tweet in entry['tweets']] == list(range(11, 1, -1))
+
+
+def test_filled_delta_fetch_replaces_the_entry():
+    history = TweetHistory(LRUCache(10), ttl=60)
+    history.merge('search', 'q', 3, tweets(1, 2, 3))
+
+    # Three new tweets may not reach back to id 3, so the old ones are dropped
+    merged = history.merge('search', 'q', 3, tweets(20, 21, 22), history.lookup('search', 'q', 3))
+    assert [tweet['id'] for tweet in merged] == [22, 21, 20]
+    assert [tweet['id'] for tweet in history.lookup('search', 'q', 3)['tweets']] == [22, 21, 20]
+
+
+def test_large_requests_bypass_history():
+    history = TweetHistory(LRUCache(10), ttl=60, max_tweets=5)
+    merged = history.merge('search', 'q', 6, tweets(*range(1, 7)))
+    assert len(merged) == 6
+    assert history.lookup('search', 'q', 6) is None
+    assert len(history.store) == 0
@@ -3,15 +3,109 @@ Twitter API Module - Handles all Twitter API interactions
 """
 
 import tweepy
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import queue
+import threading
 import time
 
+from caching import LRUCache, SingleFlight, make_key
+from rate_limit import (
+    SEARCH_RECENT, TWEET, USER_BY_USERNAME, USER_TWEETS,
+    RateLimitExceeded, RateLimitScheduler
+)
+
+# Seconds each kind of response stays cached: profiles change rarely,
+# tweet lists and engagement metrics change within minutes
+DEFAULT_CACHE_TTLS = {
+    'user': 600,
+    'user_tweets': 60,
+    'replies': 60,
+    'search': 60,
+    'tweet': 60,
+    'user_id': 3600
+}
+
+# Optional tweet dict fields and the tweet_field each one adds to the request;
+# every tweet dict has id/text/created_at/likes/retweets/replies
+OPTIONAL_TWEET_FIELDS = {
+    'author_id': 'author_id',
+    'hashtags': 'entities',
+    'impressions': None
+}
+
+
+class PartialList(list):
+    """
+    Tweets of a fetch that stopped before its last page (deadline, rate-limit
+    reserve or an error mid-pagination); returned as is but never cached
+    """
+
 
 class TwitterAPI:
-    def __init__(self, bearer_token):
-        """Initialize Twitter API client"""
-        self.client = tweepy.Client(bearer_token=bearer_token, wait_on_rate_limit=True)
+    def __init__(self, bearer_token, max_workers=8, cache=None, cache_size=1000, cache_ttls=None,
+                 rate_limit_reserve=0.1, rate_limit_max_wait=1.0):
+        """
+        Initialize Twitter API client
+        max_workers: size of the thread pool shared by all parallel fetches
+        cache: response cache backend (LRUCache or SQLiteCache); defaults to an
+               in-process LRUCache of cache_size entries
+        cache_ttls: per-kind TTL overrides of DEFAULT_CACHE_TTLS
+        rate_limit_reserve: share of each window kept back from follow-up pages
+        rate_limit_max_wait: longest wait for a window reset before failing fast
+        """
+        # No wait_on_rate_limit: an exhausted window raises RateLimitExceeded
+        # instead of sleeping the worker for up to 15 minutes
+        self.client = tweepy.Client(bearer_token=bearer_token, wait_on_rate_limit=False)
+        self.rate_limiter = RateLimitScheduler(rate_limit_reserve, rate_limit_max_wait)
+        self.client.session.hooks['response'].append(self.rate_limiter.record_response)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='twitter-api')
+        self.cache = cache if cache is not None else LRUCache(cache_size)
+        self.cache_ttls = {**DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
+        self.search_flights = SingleFlight()
+    
+    def gather(self, *calls):
+        """
+        Run independent API calls concurrently on the shared pool
+        calls: (function, *args) tuples
+        Returns: results in call order (wall time ~ the slowest call)
+        """
+        futures = [self.executor.submit(call[0], *call[1:]) for call in calls]
+        return [future.result() for future in futures]
+    
+    def _call(self, endpoint, method, priority='high', **params):
+        """
+        Make one API call against the endpoint's rate-limit budget
+        Raises: RateLimitExceeded when the window is spent
+        """
+        self.rate_limiter.acquire(endpoint, priority)
+        try:
+            return method(**params)
+        except tweepy.TooManyRequests:
+            # Budget was spent elsewhere (another process or app); the response
+            # hook has already recorded the window
+            raise RateLimitExceeded(endpoint, self.rate_limiter.retry_after(endpoint))
+    
+    def _cached(self, kind, key_args, fetch, *args):
+        """
+        Response cache around fetch(*args), keyed by kind plus normalized key_args
+        Empty results (not found, or errors already reported) and partial ones
+        (a PartialList) are not cached, nor is anything whose kind has a ttl of 0
+        """
+        ttl = self.cache_ttls[kind]
+        if ttl is not None and ttl <= 0:
+            return fetch(*args)
+        
+        key = make_key(kind, *key_args)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
         
+        value = fetch(*args)
+        if value and not isinstance(value, PartialList):
+            self.cache.set(key, value, ttl)
+        return value
+    
     def get_user_info(self, username):
         """
         Get detailed user information
@@ -19,165 +113,373 @@ class TwitterAPI:
         """
         try:
             username = username.replace('@', '')
-            user = self.client.get_user(
-                username=username,
-                user_fields=['created_at', 'description', 'public_metrics', 'verified']
-            )
-            
-            if not user.data:
-                return None
-                
-            data = user.data
-            return {
-                'id': data.id,
-                'username': data.username,
-                'name': data.name,
-                'description': data.description,
-                'created_at': data.created_at,
-                'verified': data.verified,
-                'followers_count': data.public_metrics['followers_count'],
-                'following_count': data.public_metrics['following_count'],
-                'tweet_count': data.public_metrics['tweet_count'],
-                'listed_count': data.public_metrics['listed_count']
-            }
+            return self._cached('user', (username.lower(),), self._fetch_user_info, username)
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             print(f"Error getting user info: {e}")
             return None
     
-    def get_user_tweets(self, username, max_results=100):
+    def _fetch_user_info(self, username):
+        """User lookup by username (raises on API errors)"""
+        user = self._call(
+            USER_BY_USERNAME, self.client.get_user,
+            username=username,
+            user_fields=['created_at', 'description', 'public_metrics', 'verified']
+        )
+        
+        if not user.data:
+            return None
+            
+        data = user.data
+        user_info = {
+            'id': data.id,
+            'username': data.username,
+            'name': data.name,
+            'description': data.description,
+            'created_at': data.created_at,
+            'verified': data.verified,
+            'followers_count': data.public_metrics['followers_count'],
+            'following_count': data.public_metrics['following_count'],
+            'tweet_count': data.public_metrics['tweet_count'],
+            'listed_count': data.public_metrics['listed_count']
+        }
+        return user_info
+    
+    def _paginate(self, endpoint, method, max_results, deadline=None, token_param='pagination_token',
+                  min_page_size=10, progress=None, **params):
         """
-        Get user's recent tweets
-        Returns: list of tweets with metadata
+        Follow next_token across pages of a v2 endpoint
+        progress: optional dict; its 'complete' is set False when the deadline
+                  or the rate-limit reserve stops pagination before the end
+        Yields: one tweepy Response per page, until max_results tweets were
+                requested, the last page, deadline (a time.monotonic() value),
+                or the endpoint's budget falling to its reserve
         """
-        try:
-            user_info = self.get_user_info(username)
-            if not user_info:
-                return None
-                
-            tweets = self.client.get_users_tweets(
-                id=user_info['id'],
-                max_results=min(max_results, 100),
-                tweet_fields=['created_at', 'public_metrics', 'referenced_tweets'],
-                exclude=['retweets']
-            )
-            
-            if not tweets.data:
-                return []
-                
-            tweet_list = []
-            for tweet in tweets.data:
-                tweet_list.append({
-                    'id': tweet.id,
-                    'text': tweet.text,
-                    'created_at': tweet.created_at,
-                    'likes': tweet.public_metrics['like_count'],
-                    'retweets': tweet.public_metrics['retweet_count'],
-                    'replies': tweet.public_metrics['reply_count'],
-                    'impressions': tweet.public_metrics.get('impression_count', 0)
-                })
+        remaining = max_results
+        token = None
+        
+        while remaining > 0:
+            # Endpoints cap pages at 100 and reject sizes below their minimum
+            page_size = max(min(remaining, 100), min_page_size)
+            if token:
+                params[token_param] = token
             
-            return tweet_list
+            if token is None:
+                response = self._call(endpoint, method, max_results=page_size, **params)
+            else:
+                # Follow-up pages are low priority: return what we have rather
+                # than spend the budget other requests need for their first page
+                try:
+                    response = self._call(endpoint, method, 'low', max_results=page_size, **params)
+                except RateLimitExceeded as e:
+                    print(f"Stopping pagination early: {e}")
+                    self._mark_partial(progress)
+                    break
+            yield response
             
-        except Exception as e:
-            print(f"Error getting user tweets: {e}")
-            return None
+            remaining -= response.meta.get('result_count', len(response.data or []))
+            token = response.meta.get('next_token')
+            if not token:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                if remaining > 0:
+                    self._mark_partial(progress)
+                break
     
-    def get_tweet_replies(self, tweet_id, max_results=100):
+    @staticmethod
+    def _mark_partial(progress):
+        if progress is not None:
+            progress['complete'] = False
+    
+    @staticmethod
+    def _tweet_fields(fields, *required):
         """
-        Get replies/comments on a specific tweet
-        Returns: list of reply tweets
+        tweet_fields to request: the common ones, those the optional fields
+        need and any the method itself reads (required)
         """
-        try:
-            # Search for tweets that are replies to this tweet
-            query = f"conversation_id:{tweet_id}"
-            
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                max_results=min(max_results, 100),
-                tweet_fields=['created_at', 'public_metrics', 'author_id', 'referenced_tweets']
-            )
-            
-            if not tweets.data:
-                return []
-            
-            replies = []
-            for tweet in tweets.data:
+        tweet_fields = ['created_at', 'public_metrics', *required]
+        for field in fields:
+            if field not in OPTIONAL_TWEET_FIELDS:
+                raise ValueError(f"Unknown tweet field {field!r}")
+            api_field = OPTIONAL_TWEET_FIELDS[field]
+            if api_field and api_field not in tweet_fields:
+                tweet_fields.append(api_field)
+        return tweet_fields
+    
+    @staticmethod
+    def _format_tweet(tweet, fields=()):
+        """Common fields of a tweet dict plus the requested optional ones"""
+        metrics = tweet.public_metrics
+        formatted = {
+            'id': tweet.id,
+            'text': tweet.text,
+            'created_at': tweet.created_at,
+            'likes': metrics['like_count'],
+            'retweets': metrics['retweet_count'],
+            'replies': metrics['reply_count']
+        }
+        if 'author_id' in fields:
+            formatted['author_id'] = tweet.author_id
+        if 'hashtags' in fields:
+            entities = tweet.entities
+            formatted['hashtags'] = [tag['tag'] for tag in entities['hashtags']] if entities and 'hashtags' in entities else []
+        if 'impressions' in fields:
+            formatted['impressions'] = metrics.get('impression_count', 0)
+        return formatted
+    
+    def _user_tweet_pages(self, user_id, max_results, deadline, since_id, fields, progress=None):
+        """Yields: lists of tweet dicts, one per API page (raises on API errors)"""
+        pages = self._paginate(
+            USER_TWEETS, self.client.get_users_tweets, max_results, deadline,
+            min_page_size=5,
+            progress=progress,
+            id=user_id,
+            since_id=since_id,
+            tweet_fields=self._tweet_fields(fields),
+            exclude=['retweets']
+        )
+        for response in pages:
+            yield [self._format_tweet(tweet, fields) for tweet in response.data or []]
+    
+    def _reply_pages(self, tweet_id, max_results, deadline, fields, progress=None):
+        """Yields: lists of reply dicts, one per API page (raises on API errors)"""
+        # Search for tweets that are replies to this tweet
+        pages = self._paginate(
+            SEARCH_RECENT, self.client.search_recent_tweets, max_results, deadline,
+            token_param='next_token',
+            progress=progress,
+            query=f"conversation_id:{tweet_id}",
+            tweet_fields=self._tweet_fields(fields, 'referenced_tweets')
+        )
+        for response in pages:
+            page = []
+            for tweet in response.data or []:
                 # Check if it's actually a reply
                 if hasattr(tweet, 'referenced_tweets') and tweet.referenced_tweets:
                     for ref in tweet.referenced_tweets:
                         if ref.type == 'replied_to':
-                            replies.append({
-                                'id': tweet.id,
-                                'text': tweet.text,
-                                'created_at': tweet.created_at,
-                                'author_id': tweet.author_id,
-                                'likes': tweet.public_metrics['like_count'],
-                                'retweets': tweet.public_metrics['retweet_count'],
-                                'replies': tweet.public_metrics['reply_count']
-                            })
+                            page.append(self._format_tweet(tweet, fields))
                             break
-            
-            return replies
-            
+            yield page
+    
+    def _search_pages(self, query, max_results, start_time, deadline, since_id, fields, progress=None):
+        """Yields: lists of tweet dicts, one per API page (raises on API errors)"""
+        # The API ignores start_time when since_id is given
+        if start_time is None and since_id is None:
+            start_time = datetime.utcnow() - timedelta(days=7)
+        
+        pages = self._paginate(
+            SEARCH_RECENT, self.client.search_recent_tweets, max_results, deadline,
+            token_param='next_token',
+            progress=progress,
+            query=query,
+            start_time=start_time if since_id is None else None,
+            since_id=since_id,
+            tweet_fields=self._tweet_fields(fields)
+        )
+        for response in pages:
+            yield [self._format_tweet(tweet, fields) for tweet in response.data or []]
+    
+    @staticmethod
+    def _take(pages, max_results):
+        """Yields: pages trimmed so no more than max_results items come out in total"""
+        remaining = max_results
+        for page in pages:
+            if remaining <= 0:
+                break
+            page = page[:remaining]
+            remaining -= len(page)
+            if page:
+                yield page
+    
+    def resolve_user_id(self, username):
+        """
+        Numeric id of a username, from the profile or id cache when possible
+        Returns: the id, or None if the user was not found
+        """
+        try:
+            return self._resolve_user_id(username)
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"Error resolving user id: {e}")
+            return None
+    
+    def _resolve_user_id(self, username, user_id=None):
+        """An already-known id as is, otherwise the (cached) lookup's id or None"""
+        if user_id is not None:
+            return user_id
+        
+        username = username.replace('@', '')
+        # A cached profile carries the id; otherwise look up the id alone
+        user_info = self.cache.get(make_key('user', username.lower()))
+        if user_info is not None:
+            return user_info['id']
+        return self._cached('user_id', (username.lower(),), self._fetch_user_id, username)
+    
+    def _fetch_user_id(self, username):
+        """Id of a username, without any user_fields (raises on API errors)"""
+        user = self._call(USER_BY_USERNAME, self.client.get_user, username=username)
+        return user.data.id if user.data else None
+    
+    def iter_user_tweets(self, username, max_results=100, deadline=None, user_id=None, since_id=None,
+                         fields=('impressions',), progress=None):
+        """
+        Stream a user's recent tweets page by page, beyond the 100-per-call cap
+        deadline: time.monotonic() value after which no further page is requested
+        user_id: already-resolved numeric id; skips the user lookup
+        since_id: only tweets newer than this id
+        fields: optional tweet fields (OPTIONAL_TWEET_FIELDS) the caller reads;
+                only those are requested and built
+        progress: optional dict; its 'complete' is set False if the stream
+                  stops early (deadline, rate-limit reserve or an error)
+        Yields: lists of tweet dicts
+        """
+        try:
+            user_id = self._resolve_user_id(username, user_id)
+            if user_id is None:
+                return
+            yield from self._take(
+                self._user_tweet_pages(user_id, max_results, deadline, since_id, fields, progress), max_results
+            )
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"Error getting user tweets: {e}")
+            self._mark_partial(progress)
+    
+    def iter_tweet_replies(self, tweet_id, max_results=100, deadline=None, fields=('author_id',), progress=None):
+        """
+        Stream replies to a tweet page by page
+        fields: optional tweet fields the caller reads
+        progress: optional dict; its 'complete' is set False if the stream stops early
+        Yields: lists of reply dicts
+        """
+        try:
+            yield from self._take(
+                self._reply_pages(tweet_id, max_results, deadline, fields, progress), max_results
+            )
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             print(f"Error getting tweet replies: {e}")
-            return []
+            self._mark_partial(progress)
     
-    def search_tweets(self, query, max_results=100, start_time=None):
+    def iter_search_tweets(self, query, max_results=100, start_time=None, deadline=None, since_id=None,
+                           fields=('author_id', 'hashtags'), progress=None):
         """
-        Search tweets by query
+        Stream search results page by page, beyond the 100-per-call cap
+        since_id: only tweets newer than this id (start_time is then ignored)
+        fields: optional tweet fields the caller reads
+        progress: optional dict; its 'complete' is set False if the stream stops early
+        Yields: lists of tweet dicts
         """
         try:
-            if start_time is None:
-                start_time = datetime.utcnow() - timedelta(days=7)
-            
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                max_results=min(max_results, 100),
-                start_time=start_time,
-                tweet_fields=['created_at', 'public_metrics', 'author_id', 'entities']
+            yield from self._take(
+                self._search_pages(query, max_results, start_time, deadline, since_id, fields, progress),
+                max_results
             )
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"Error searching tweets: {e}")
+            self._mark_partial(progress)
+    
+    def get_user_tweets(self, username, max_results=100, deadline=None, user_id=None, since_id=None,
+                        fields=('impressions',)):
+        """
+        Get user's recent tweets
+        user_id: already-resolved numeric id; skips the user lookup
+        since_id: only tweets newer than this id
+        fields: optional tweet fields the caller reads
+        Returns: list of tweets with metadata
+        """
+        try:
+            user_id = self._resolve_user_id(username, user_id)
+            if user_id is None:
+                return None
             
-            if not tweets.data:
-                return []
-            
-            tweet_list = []
-            for tweet in tweets.data:
-                hashtags = []
-                if hasattr(tweet, 'entities') and tweet.entities and 'hashtags' in tweet.entities:
-                    hashtags = [tag['tag'] for tag in tweet.entities['hashtags']]
-                
-                tweet_list.append({
-                    'id': tweet.id,
-                    'text': tweet.text,
-                    'created_at': tweet.created_at,
-                    'author_id': tweet.author_id,
-                    'likes': tweet.public_metrics['like_count'],
-                    'retweets': tweet.public_metrics['retweet_count'],
-                    'replies': tweet.public_metrics['reply_count'],
-                    'hashtags': hashtags
-                })
-            
-            return tweet_list
+            return self._cached('user_tweets', (user_id, max_results, since_id, fields), self._fetch_user_tweets,
+                                user_id, max_results, deadline, since_id, fields)
             
+        except RateLimitExceeded:
+            raise
         except Exception as e:
-            print(f"Error searching tweets: {e}")
-            return []
+            print(f"Error getting user tweets: {e}")
+            return None
     
-    def compare_users(self, username1, username2, max_tweets=50):
+    def _fetch_user_tweets(self, user_id, max_results, deadline, since_id, fields):
+        progress = {'complete': True}
+        tweet_list = []
+        pages = self._user_tweet_pages(user_id, max_results, deadline, since_id, fields, progress)
+        for page in self._take(pages, max_results):
+            tweet_list.extend(page)
+        return tweet_list if progress['complete'] else PartialList(tweet_list)
+    
+    def get_tweet_replies(self, tweet_id, max_results=100, deadline=None, fields=('author_id',)):
+        """
+        Get replies/comments on a specific tweet
+        fields: optional tweet fields the caller reads
+        Returns: list of reply tweets
+        """
+        return self._cached('replies', (str(tweet_id), max_results, fields), self._fetch_replies,
+                            tweet_id, max_results, deadline, fields)
+    
+    def _fetch_replies(self, tweet_id, max_results, deadline, fields):
+        progress = {'complete': True}
+        replies = []
+        for page in self.iter_tweet_replies(tweet_id, max_results, deadline, fields, progress):
+            replies.extend(page)
+        return replies if progress['complete'] else PartialList(replies)
+    
+    def search_tweets(self, query, max_results=100, start_time=None, deadline=None, since_id=None,
+                      fields=('author_id', 'hashtags')):
+        """
+        Search tweets by query
+        since_id: only tweets newer than this id
+        fields: optional tweet fields the caller reads
+        Identical searches already in flight are joined instead of re-fetched
+        """
+        key = (query.strip(), max_results, start_time, since_id, fields)
+        return list(self.search_flights.do(
+            key, self._cached, 'search', key, self._search_all,
+            query, max_results, start_time, deadline, since_id, fields
+        ))
+    
+    def _search_all(self, query, max_results, start_time, deadline, since_id, fields):
+        progress = {'complete': True}
+        tweet_list = []
+        for page in self.iter_search_tweets(query, max_results, start_time, deadline, since_id, fields, progress):
+            tweet_list.extend(page)
+        return tweet_list if progress['complete'] else PartialList(tweet_list)
+    
+    def _user_with_tweets(self, username, max_tweets, fields):
+        """
+        Resolve a user once and fetch their tweets with the resolved id
+        Returns: (user info, tweets) - (None, None) if the user was not found
+        """
+        user_info = self.get_user_info(username)
+        if not user_info:
+            return None, None
+        
+        return user_info, self.get_user_tweets(username, max_tweets, user_id=user_info['id'], fields=fields)
+    
+    def compare_users(self, username1, username2, max_tweets=50, fields=('impressions',)):
         """
         Compare two users' profiles and tweets
+        Both users are fetched concurrently, one profile lookup each
+        fields: optional tweet fields the caller reads
         """
         try:
-            user1_info = self.get_user_info(username1)
-            user2_info = self.get_user_info(username2)
+            (user1_info, user1_tweets), (user2_info, user2_tweets) = self.gather(
+                (self._user_with_tweets, username1, max_tweets, fields),
+                (self._user_with_tweets, username2, max_tweets, fields)
+            )
             
             if not user1_info or not user2_info:
                 return None
             
-            user1_tweets = self.get_user_tweets(username1, max_tweets)
-            user2_tweets = self.get_user_tweets(username2, max_tweets)
-            
             return {
                 'user1': {
                     'info': user1_info,
@@ -189,39 +491,102 @@ class TwitterAPI:
                 }
             }
             
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             print(f"Error comparing users: {e}")
             return None
     
-    def get_single_tweet(self, tweet_id):
+    def compare_tweets(self, tweet_id1, tweet_id2, max_replies=100, fields=('author_id',)):
+        """
+        Fetch two tweets and their replies, all four calls concurrently
+        fields: optional tweet fields the caller reads, for tweets and replies
+        Returns: None if either tweet was not found
+        """
+        tweet1, tweet2, replies1, replies2 = self.gather(
+            (self.get_single_tweet, tweet_id1, fields),
+            (self.get_single_tweet, tweet_id2, fields),
+            (self.get_tweet_replies, tweet_id1, max_replies, None, fields),
+            (self.get_tweet_replies, tweet_id2, max_replies, None, fields)
+        )
+        
+        if not tweet1 or not tweet2:
+            return None
+        
+        return {
+            'tweet1': {'details': tweet1, 'replies': replies1},
+            'tweet2': {'details': tweet2, 'replies': replies2}
+        }
+    
+    def get_single_tweet(self, tweet_id, fields=('author_id',)):
         """
         Get details of a single tweet
+        fields: optional tweet fields the caller reads
         """
+        return self._cached('tweet', (str(tweet_id), fields), self._fetch_single_tweet, tweet_id, fields)
+    
+    def _fetch_single_tweet(self, tweet_id, fields):
         try:
-            tweet = self.client.get_tweet(
+            tweet = self._call(
+                TWEET, self.client.get_tweet,
                 id=tweet_id,
-                tweet_fields=['created_at', 'public_metrics', 'author_id']
+                tweet_fields=self._tweet_fields(fields)
             )
             
             if not tweet.data:
                 return None
             
-            t = tweet.data
-            return {
-                'id': t.id,
-                'text': t.text,
-                'created_at': t.created_at,
-                'author_id': t.author_id,
-                'likes': t.public_metrics['like_count'],
-                'retweets': t.public_metrics['retweet_count'],
-                'replies': t.public_metrics['reply_count']
-            }
+            return self._format_tweet(tweet.data, fields)
             
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             print(f"Error getting single tweet: {e}")
             return None
 
 
+def prefetch(pages, depth=2):
+    """
+    Drive a page iterator from a background thread, keeping up to depth pages
+    ready, so the caller can analyze page N while page N+1 is downloading
+    Yields: the iterator's items in order; its exceptions are re-raised here
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item):
+        # Give up once the consumer has gone away instead of blocking forever
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for page in pages:
+                if not put((page, None)):
+                    return
+            put((done, None))
+        except Exception as e:
+            put((done, e))
+    
+    threading.Thread(target=produce, name='twitter-prefetch', daemon=True).start()
+    try:
+        while True:
+            page, error = buffer.get()
+            if page is done:
+                if error is not None:
+                    raise error
+                return
+            yield page
+    finally:
+        stop.set()
+
+
 class TwitterStreamer:
     """
     Real-time Twitter streaming (requires elevated access)